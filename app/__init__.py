@@ -1,6 +1,8 @@
 from flask import Flask, redirect, request, render_template
 from .config import config_by_name
-from .extensions import db, migrate, login_manager, csrf, limiter
+from .extensions import db, migrate, login_manager, csrf, limiter, set_sqlite_pragmas
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 import ssl
 import os
 from datetime import datetime, timezone, timedelta
@@ -14,9 +16,16 @@ def create_app(config_name=None):
     # Configure upload folder
     app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload
+    
+    # Create upload directories once at startup instead of on every upload request
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'rollback_plans'), exist_ok=True)
 
     # initialize extensions
     db.init_app(app)
+    if app.config.get('SQLITE_WAL'):
+        from sqlalchemy import event
+        with app.app_context():
+            event.listen(db.engine, 'connect', set_sqlite_pragmas)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
@@ -80,6 +89,32 @@ def create_app(config_name=None):
             url = request.url.replace("http://", "https://", 1)
             return redirect(url, code=301)
 
+    # Write queued audit logs in batches (see AuditLog.enqueue)
+    @app.teardown_request
+    def flush_audit_logs(exc):
+        from app.audit.logger import flush_audit_queue
+        # Anything the request left uncommitted is discarded, never written
+        # as a side effect of the audit flush
+        db.session.rollback()
+        flush_audit_queue()
+
+    def flush_audit_logs_on_exit():
+        from app.audit.logger import flush_audit_queue
+        with app.app_context():
+            flush_audit_queue(force=True)
+
+    atexit.register(flush_audit_logs_on_exit)
+
+    # Background pool for outgoing email (see EmailService.send_bulk);
+    # queued messages are still delivered on shutdown
+    if app.config.get('EMAIL_ASYNC'):
+        email_pool = ThreadPoolExecutor(
+            max_workers=app.config.get('EMAIL_WORKERS', 4),
+            thread_name_prefix='email'
+        )
+        app.extensions['email_pool'] = email_pool
+        atexit.register(email_pool.shutdown)
+
     # Initialize SLA monitoring (CMSF-015, CMSF-016)
     if not app.config.get('TESTING', False):
         from app.services.sla_monitor import start_sla_monitoring
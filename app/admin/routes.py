@@ -9,8 +9,8 @@ from app.auth.decorators import admin_required
 from app.models import User, Role, Project, ProjectMembership, ChangeRequest, UserInvitation
 from app.extensions import db
 from app.services import EmailService
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
 import pyotp
 import secrets
 
@@ -76,7 +76,7 @@ def dashboard():
     recent_projects = Project.query.filter_by(is_active=True).order_by(Project.created_at.desc()).limit(5).all()
     
     # Get recently closed CRs with timeline details (CMSF-019)
-    closed_crs = ChangeRequest.query.filter_by(status=CRStatus.CLOSED).order_by(
+    closed_crs = ChangeRequest.query_for_list().filter_by(status=CRStatus.CLOSED).order_by(
         ChangeRequest.closed_date.desc()
     ).limit(10).all()
     
@@ -162,8 +162,10 @@ def create_project():
 def project_detail(project_id):
     """View project details"""
     project = Project.query.get_or_404(project_id)
-    members = ProjectMembership.query.filter_by(project_id=project_id, is_active=True).all()
-    crs = ChangeRequest.query.filter_by(project_id=project_id).order_by(ChangeRequest.created_at.desc()).limit(10).all()
+    members = ProjectMembership.query.options(
+        joinedload(ProjectMembership.user), joinedload(ProjectMembership.role)
+    ).filter_by(project_id=project_id, is_active=True).all()
+    crs = ChangeRequest.query_for_list().filter_by(project_id=project_id).order_by(ChangeRequest.created_at.desc()).limit(10).all()
     
     # Get unassigned users
     assigned_user_ids = [m.user_id for m in members]
@@ -262,8 +264,7 @@ def delete_project(project_id):
         return redirect(url_for('admin.project_detail', project_id=project_id))
     
     # Check admin password
-    from werkzeug.security import check_password_hash
-    if not check_password_hash(current_user.password_hash, admin_password):
+    if not current_user.check_password(admin_password):
         flash('❌ Incorrect admin password. Project deletion cancelled.', 'danger')
         return redirect(url_for('admin.project_detail', project_id=project_id))
     
@@ -298,7 +299,13 @@ def delete_project(project_id):
 @admin_required
 def users():
     """List all users"""
-    all_users = User.query.order_by(User.created_at.desc()).all()
+    # Memberships are only counted and invitations only checked for status
+    all_users = User.query.options(
+        selectinload(User.project_memberships).load_only(ProjectMembership.id, ProjectMembership.user_id),
+        selectinload(User.invitation).load_only(
+            UserInvitation.id, UserInvitation.user_id, UserInvitation.is_accepted, UserInvitation.expires_at
+        )
+    ).order_by(User.created_at.desc()).all()
     return render_template('admin/users.html', users=all_users)
 
 
@@ -339,7 +346,6 @@ def create_user():
         user = User(
             email=email,
             username=username or email.split('@')[0],
-            password_hash=generate_password_hash(temp_password),
             role_id=int(role_id),
             first_name=first_name,
             last_name=last_name,
@@ -347,6 +353,7 @@ def create_user():
             mfa_secret=mfa_secret,
             mfa_enabled=enable_mfa  # MFA only for admins
         )
+        user.set_password(temp_password)
         
         db.session.add(user)
         db.session.flush()  # Get user.id
@@ -674,7 +681,7 @@ def delete_user(user_id):
         return redirect(url_for('admin.users'))
     
     # Verify admin password
-    if not check_password_hash(current_user.password_hash, admin_password):
+    if not current_user.check_password(admin_password):
         flash('❌ Incorrect admin password', 'danger')
         return redirect(url_for('admin.users'))
     
@@ -694,10 +701,10 @@ def delete_user(user_id):
     
     # Unassign user from CRs where they are approver or implementer
     if as_approver > 0:
-        ChangeRequest.query.filter_by(approver_id=user_to_delete.id).update({'approver_id': None})
+        ChangeRequest.query.filter_by(approver_id=user_to_delete.id).update({'approver_id': None, 'approver_email': None})
     
     if as_implementer > 0:
-        ChangeRequest.query.filter_by(implementer_id=user_to_delete.id).update({'implementer_id': None})
+        ChangeRequest.query.filter_by(implementer_id=user_to_delete.id).update({'implementer_id': None, 'implementer_email': None})
     
     # Remove user from all project memberships
     ProjectMembership.query.filter_by(user_id=user_to_delete.id).update({'is_active': False})
@@ -2,11 +2,19 @@
 Audit logging utilities
 Implements CMS-F-013, CMS-F-014
 """
-from flask import request
+import time
+from flask import request, current_app
 from flask_login import current_user
 from app.models.audit import AuditLog, AuditEventType, AuditEventCategory
 
 
+# Monotonic time of the last batch write of queued audit logs
+_last_flush = time.monotonic()
+
+# Consecutive failed writes of the batch at the head of the queue
+_failed_flushes = 0
+
+
 def log_http_request(request_obj, response):
     """
     Log HTTP requests for audit trail
@@ -21,7 +29,7 @@ def log_http_request(request_obj, response):
     
     # Only log authenticated requests or important endpoints
     if current_user.is_authenticated or request_obj.path.startswith('/auth/'):
-        AuditLog.create_log(
+        AuditLog.enqueue(
             event_type='http_request',
             event_category=AuditEventCategory.SYSTEM,
             user=current_user if current_user.is_authenticated else None,
@@ -36,7 +44,7 @@ def log_http_request(request_obj, response):
         )
 
 
-def log_cr_event(event_type, cr, user, description=None, metadata=None):
+def log_cr_event(event_type, cr, user, description=None, metadata=None, deferred=False):
     """
     Log change request event
     
@@ -46,8 +54,10 @@ def log_cr_event(event_type, cr, user, description=None, metadata=None):
         user: User performing the action
         description: Event description
         metadata: Additional metadata
+        deferred: Queue the entry for the next batch write instead of committing now
     """
-    AuditLog.create_log(
+    write = AuditLog.enqueue if deferred else AuditLog.create_log
+    write(
         event_type=event_type,
         event_category=AuditEventCategory.CHANGE_REQUEST,
         user=user,
@@ -58,3 +68,48 @@ def log_cr_event(event_type, cr, user, description=None, metadata=None):
         success=True,
         metadata=metadata or {}
     )
+
+
+def flush_audit_queue(force=False):
+    """
+    Write queued audit logs once the batch is full or the flush interval has passed
+    Called at the end of every request.
+    
+    Args:
+        force: Write whatever is queued regardless of batch size and interval
+    
+    Returns:
+        int: Number of entries written
+    """
+    global _last_flush, _failed_flushes
+    
+    pending = AuditLog.pending_count()
+    if not pending:
+        return 0
+    
+    batch_size = current_app.config.get('AUDIT_BATCH_SIZE', 200)
+    interval = current_app.config.get('AUDIT_FLUSH_INTERVAL', 5)
+    retries = current_app.config.get('AUDIT_MAX_RETRIES', 3)
+    now = time.monotonic()
+    
+    if not force and pending < batch_size and now - _last_flush < interval:
+        return 0
+    
+    _last_flush = now
+    # A batch that keeps failing (e.g. a row the database rejects) is dropped
+    # after the last retry so it cannot block the entries queued behind it
+    requeue = _failed_flushes < retries
+    try:
+        written = AuditLog.flush_pending(limit=pending, requeue=requeue)
+    except Exception as e:
+        if requeue:
+            _failed_flushes += 1
+            current_app.logger.error(f"Failed to write {pending} queued audit logs: {str(e)}")
+        else:
+            _failed_flushes = 0
+            current_app.logger.error(
+                f"Dropped {pending} queued audit logs after {retries + 1} failed writes: {str(e)}"
+            )
+        return 0
+    _failed_flushes = 0
+    return written
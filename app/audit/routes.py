@@ -2,14 +2,19 @@
 Audit routes
 Implements CMS-F-014: Generate audit reports
 """
-from flask import render_template, request, send_file
+from flask import render_template, request, Response, stream_with_context
 from flask_login import login_required
 from app.audit import audit_bp
 from app.auth.decorators import permission_required
 from app.models import AuditLog
 from datetime import datetime, timedelta
 import csv
-import io
+
+
+class _CSVLine:
+    """File-like object whose write() hands back the formatted CSV line"""
+    def write(self, value):
+        return value
 
 
 @audit_bp.route('/logs')
@@ -90,34 +95,41 @@ def export_logs():
         date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
         query = query.filter(AuditLog.timestamp <= date_to_obj)
     
-    logs = query.order_by(AuditLog.timestamp.desc()).all()
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['ID', 'Timestamp', 'Event Type', 'Category', 'Username', 
-                     'IP Address', 'Description', 'Success'])
-    
-    # Write data
-    for log in logs:
-        writer.writerow([
-            log.id,
-            log.timestamp.isoformat(),
-            log.event_type,
-            log.event_category,
-            log.username or 'N/A',
-            log.ip_address or 'N/A',
-            log.event_description or 'N/A',
-            'Yes' if log.success else 'No'
-        ])
-    
-    # Prepare response
-    output.seek(0)
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
+    # Stream rows in batches instead of materializing the whole log
+    rows = query.with_entities(
+        AuditLog.id,
+        AuditLog.timestamp,
+        AuditLog.event_type,
+        AuditLog.event_category,
+        AuditLog.username,
+        AuditLog.ip_address,
+        AuditLog.event_description,
+        AuditLog.success
+    ).order_by(AuditLog.timestamp.desc()).yield_per(1000)
+    
+    def generate():
+        writer = csv.writer(_CSVLine())
+        
+        # Write header
+        yield writer.writerow(['ID', 'Timestamp', 'Event Type', 'Category', 'Username', 
+                               'IP Address', 'Description', 'Success'])
+        
+        # Write data
+        for log in rows:
+            yield writer.writerow([
+                log.id,
+                log.timestamp.isoformat(),
+                log.event_type,
+                log.event_category,
+                log.username or 'N/A',
+                log.ip_address or 'N/A',
+                log.event_description or 'N/A',
+                'Yes' if log.success else 'No'
+            ])
+    
+    filename = f'audit_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    return Response(
+        stream_with_context(generate()),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'audit_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    )
\ No newline at end of file
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
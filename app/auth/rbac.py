@@ -12,7 +12,7 @@ def role_required(role_name):
             user = getattr(g, "current_user", None)
             if not user:
                 abort(403)
-            names = [r.name for r in getattr(user, "roles", [])]
+            names = {r.name for r in getattr(user, "roles", ())}
             if role_name not in names:
                 abort(403)
             return f(*args, **kwargs)
@@ -9,7 +9,6 @@ from app.auth.forms import LoginForm, MFAVerifyForm, ProfileForm, AcceptInvitati
 from app.models import User, UserInvitation
 from app.models.audit import AuditLog, AuditEventType, AuditEventCategory
 from app.extensions import db, limiter, csrf
-from werkzeug.security import generate_password_hash
 
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -156,16 +155,11 @@ def verify_mfa():
     form = MFAVerifyForm()
     
     # Generate provisioning URI for setup
-    import pyotp
     import qrcode
     import qrcode.image.svg
     import io
     
-    totp = pyotp.TOTP(user.mfa_secret)
-    provisioning_uri = totp.provisioning_uri(
-        name=user.email,
-        issuer_name='Change Management System'
-    )
+    provisioning_uri = user.get_totp_uri(issuer_name='Change Management System')
     
     # Generate QR code as SVG (no Pillow required)
     factory = qrcode.image.svg.SvgPathImage
@@ -256,11 +250,11 @@ def accept_invitation(token):
         session.clear()
     
     # Find invitation
-    invitation = UserInvitation.query.filter_by(token=token).first()
+    invitation = UserInvitation.find_valid(token)
     
     if not invitation:
-        current_app.logger.error(f"Invalid invitation token: {token}")
-        flash('Invalid invitation link.', 'danger')
+        current_app.logger.error(f"Invalid or used invitation token: {token}")
+        flash('Invalid or already used invitation link.', 'danger')
         return redirect(url_for('auth.login'))
     
     if not invitation.is_valid():
@@ -287,7 +281,7 @@ def accept_invitation(token):
                 user.first_name = full_name
                 user.last_name = ''
             
-            user.password_hash = generate_password_hash(form.password.data)
+            user.set_password(form.password.data)
             user.is_active = True
             # MFA is already configured via invitation (admin-only)
             
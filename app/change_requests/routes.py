@@ -3,13 +3,20 @@ Change Request routes
 Implements CMS-F-005, CMS-F-006, CMS-F-007
 """
 import os
-from flask import render_template, redirect, url_for, flash, request, current_app, abort, jsonify
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+from urllib.parse import quote
+from flask import render_template, redirect, url_for, flash, request, current_app, abort, jsonify, make_response, session
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
+from sqlalchemy.orm import load_only, joinedload
 from app.change_requests import cr_bp
 from app.change_requests.forms import ChangeRequestForm, ApprovalForm, RollbackForm, ClosureForm
 from app.auth.decorators import permission_required
-from app.models import ChangeRequest, CRAttachment, CRStatus, User, Project
+from app.models import ChangeRequest, CRAttachment, CRStatus, User, Project, ProjectMembership, Role, Permission
+from app.models.role import role_permissions
 from app.models.audit import AuditEventType
 from app.audit.logger import log_cr_event
 from app.services import EmailService
@@ -17,6 +24,58 @@ from app.extensions import db
 from datetime import datetime
 
 
+# Statuses implementers are allowed to see (approved and later)
+_IMPLEMENTER_VISIBLE_STATUSES = (
+    CRStatus.APPROVED,
+    CRStatus.IN_PROGRESS,
+    CRStatus.IMPLEMENTED,
+    CRStatus.CLOSED,
+    CRStatus.ROLLED_BACK,
+)
+
+# Statuses in which the requester may still attach a rollback plan
+_ROLLBACK_PLAN_EDITABLE_STATUSES = (CRStatus.DRAFT, CRStatus.SUBMITTED)
+
+# Timeline events shown on the close page, in display order
+_CLOSE_EVENTS = (
+    ('created', 'Created'),
+    ('submitted', 'Submitted'),
+    ('approved', 'Approved'),
+    ('implemented', 'Implemented'),
+    ('closed', 'Closed'),
+)
+
+
+def _atomic_write_text(path, content):
+    """
+    Replace the contents of a file atomically.
+    Writes to a temp file in the same directory and renames it over the
+    original, so a crash mid-write never leaves a truncated file behind.
+    """
+    data = content.encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb', buffering=0) as f:
+            f.write(data)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _get_cr_or_404(cr_id):
+    """
+    Load a CR together with its project so the
+    membership check that follows needs no extra lookup
+    """
+    return ChangeRequest.query.options(
+        joinedload(ChangeRequest.project)
+    ).get_or_404(cr_id)
+
+
 @cr_bp.route('/')
 @login_required
 def list_change_requests():
@@ -33,31 +92,37 @@ def list_change_requests():
     priority = request.args.get('priority')
     project_id = request.args.get('project_id', type=int)
     
-    user_role_name = current_user.role.name.lower() if current_user.role else None
+    user_role_name = current_user.role_name_lower
     
     # Build query based on user role and project access
     if user_role_name == 'admin':
         # Admins see only CRs of projects they created
-        admin_projects = Project.query.filter_by(created_by_id=current_user.id).all()
-        admin_project_ids = [p.id for p in admin_projects]
+        admin_project_ids = [
+            pid for (pid,) in Project.query.with_entities(Project.id)
+            .filter_by(created_by_id=current_user.id).all()
+        ]
         
         if not admin_project_ids:
             flash('You have not created any projects yet.', 'info')
             return render_template('change_requests/list.html', change_requests=None, user_projects=[])
         
-        query = ChangeRequest.query.filter(ChangeRequest.project_id.in_(admin_project_ids))
-        user_projects_list = admin_projects
+        query = ChangeRequest.query_for_list().filter(ChangeRequest.project_id.in_(admin_project_ids))
+        # The project dropdown only needs id and name
+        user_projects_list = Project.query.options(
+            load_only(Project.id, Project.name)
+        ).filter(Project.id.in_(admin_project_ids)).all()
         
     else:
         # Get user's assigned projects
-        user_projects = [p.id for p in current_user.get_projects()]
+        user_projects_list = current_user.get_projects()
+        user_projects = [p.id for p in user_projects_list]
         
         if not user_projects:
             flash('You are not assigned to any project. Contact admin.', 'warning')
             return render_template('change_requests/list.html', change_requests=None, user_projects=[])
         
         # Filter by projects user has access to
-        query = ChangeRequest.query.filter(ChangeRequest.project_id.in_(user_projects))
+        query = ChangeRequest.query_for_list().filter(ChangeRequest.project_id.in_(user_projects))
         
         if user_role_name == 'requester':
             # Requesters only see their own CRs
@@ -65,17 +130,9 @@ def list_change_requests():
         
         elif user_role_name == 'implementer':
             # Implementers only see APPROVED CRs (ready for implementation)
-            query = query.filter(ChangeRequest.status.in_([
-                CRStatus.APPROVED,
-                CRStatus.IN_PROGRESS,
-                CRStatus.IMPLEMENTED,
-                CRStatus.CLOSED,
-                CRStatus.ROLLED_BACK
-            ]))
+            query = query.filter(ChangeRequest.status.in_(_IMPLEMENTER_VISIBLE_STATUSES))
         
         # Approvers see all CRs in their projects (no additional filter needed)
-        
-        user_projects_list = current_user.get_projects()
     
     # Apply filters
     if project_id:
@@ -141,6 +198,7 @@ def create():
             implementation_deadline=form.implementation_deadline.data,  # CMSF-015: SLA tracking
             rollback_plan=form.rollback_plan.data,
             requester_id=current_user.id,
+            requester_email=current_user.email,
             status=CRStatus.DRAFT
         )
         
@@ -160,9 +218,7 @@ def create():
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 unique_filename = f"rollback_{timestamp}_{filename}"
                 
-                # Create rollback_plans subdirectory
                 rollback_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'rollback_plans')
-                os.makedirs(rollback_folder, exist_ok=True)
                 
                 file_path = os.path.join(rollback_folder, unique_filename)
                 file.save(file_path)
@@ -173,7 +229,7 @@ def create():
         # Handle file uploads (CMS-F-006)
         if form.attachments.data:
             upload_folder = current_app.config['UPLOAD_FOLDER']
-            os.makedirs(upload_folder, exist_ok=True)
+            attachments = []
             
             for file in form.attachments.data:
                 if file and file.filename:
@@ -186,16 +242,16 @@ def create():
                     # Save file
                     file.save(file_path)
                     
-                    # Create attachment record
-                    attachment = CRAttachment(
-                        change_request_id=cr.id,
-                        filename=unique_filename,
-                        original_filename=filename,
-                        file_path=file_path,
-                        file_size=os.path.getsize(file_path),
-                        uploaded_by_id=current_user.id
-                    )
-                    db.session.add(attachment)
+                    attachments.append({
+                        'filename': unique_filename,
+                        'original_filename': filename,
+                        'file_path': file_path,
+                        'file_size': os.path.getsize(file_path),
+                        'uploaded_by_id': current_user.id
+                    })
+            
+            # Insert all attachment records in one round-trip
+            cr.add_attachments_bulk(attachments)
         
         # Check if submitting for approval
         if 'submit_for_approval' in request.form:
@@ -220,15 +276,22 @@ def create():
         if cr.status == CRStatus.PENDING_APPROVAL:
             try:
                 # Get approvers for the project (users with approve_cr permission)
-                project = Project.query.get(cr.project_id)
-                approvers = [member.user for member in project.members 
-                           if member.user.has_permission('approve_cr')]
+                # in a single query instead of checking each member in Python
+                approvers = User.query.join(
+                    ProjectMembership, ProjectMembership.user_id == User.id
+                ).join(
+                    role_permissions, role_permissions.c.role_id == User.role_id
+                ).join(
+                    Permission, Permission.id == role_permissions.c.permission_id
+                ).filter(
+                    ProjectMembership.project_id == cr.project_id,
+                    Permission.name == 'approve_cr'
+                ).all()
                 
                 if approvers:
-                    email_service = EmailService()
-                    email_service.send_cr_submission_notification(cr, approvers)
+                    EmailService.send_cr_submission_notification(cr, approvers)
                 else:
-                    current_app.logger.warning(f"No approvers found for project {project.name}")
+                    current_app.logger.warning(f"No approvers found for project {cr.project.name}")
             except Exception as e:
                 current_app.logger.error(f"Failed to send CR submission notification: {str(e)}")
         
@@ -249,22 +312,40 @@ def view(cr_id):
     View change request details
     Access control based on role and project membership
     """
-    cr = ChangeRequest.query.get_or_404(cr_id)
+    cr = _get_cr_or_404(cr_id)
     
     # Check if user can access this CR (includes role-based and project-based checks)
     if not current_user.can_access_cr(cr):
         flash('Access Denied: You do not have permission to view this change request.', 'danger')
         return redirect(url_for('cr.list_change_requests'))
     
+    # The page depends on the CR, its attachments and the viewer's role,
+    # so all of them go into the ETag
+    updated = cr.updated_at.isoformat() if cr.updated_at else ''
+    etag = hashlib.md5(
+        f"{cr.id}:{updated}:{len(cr.attachments)}:{current_user.id}:{current_user.role_id}".encode()
+    ).hexdigest()
+    
+    # Unchanged since the last view: skip rendering (unless flash messages are pending)
+    if '_flashes' not in session and etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    
     # Log CR view
     log_cr_event(
         AuditEventType.CR_VIEWED,
         cr,
         current_user,
-        f'Change request {cr.cr_number} viewed by {current_user.email}'
+        f'Change request {cr.cr_number} viewed by {current_user.email}',
+        deferred=True
     )
     
-    return render_template('change_requests/view.html', cr=cr)
+    response = make_response(render_template('change_requests/view.html', cr=cr))
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = 0
+    return response
 
 
 @cr_bp.route('/<int:cr_id>/edit', methods=['GET', 'POST'])
@@ -274,7 +355,7 @@ def edit(cr_id):
     Edit change request
     Implements CMS-F-007: Edit CRs before submission
     """
-    cr = ChangeRequest.query.get_or_404(cr_id)
+    cr = _get_cr_or_404(cr_id)
     
     # Check project access first
     if not current_user.can_access_cr(cr):
@@ -306,6 +387,7 @@ def edit(cr_id):
         # Handle new file uploads
         if form.attachments.data:
             upload_folder = current_app.config['UPLOAD_FOLDER']
+            attachments = []
             
             for file in form.attachments.data:
                 if file and file.filename:
@@ -316,15 +398,15 @@ def edit(cr_id):
                     
                     file.save(file_path)
                     
-                    attachment = CRAttachment(
-                        change_request_id=cr.id,
-                        filename=unique_filename,
-                        original_filename=filename,
-                        file_path=file_path,
-                        file_size=os.path.getsize(file_path),
-                        uploaded_by_id=current_user.id
-                    )
-                    db.session.add(attachment)
+                    attachments.append({
+                        'filename': unique_filename,
+                        'original_filename': filename,
+                        'file_path': file_path,
+                        'file_size': os.path.getsize(file_path),
+                        'uploaded_by_id': current_user.id
+                    })
+            
+            cr.add_attachments_bulk(attachments)
         
         # Check if submitting for approval
         if 'submit_for_approval' in request.form and cr.status == CRStatus.DRAFT:
@@ -378,12 +460,17 @@ def approve(cr_id):
             
             # Send email notification to implementers
             try:
-                project = Project.query.get(cr.project_id)
-                implementers = [member.user for member in project.members if member.user.role.name == 'implementer']
+                implementers = User.query.join(
+                    ProjectMembership, ProjectMembership.user_id == User.id
+                ).join(
+                    Role, Role.id == User.role_id
+                ).filter(
+                    ProjectMembership.project_id == cr.project_id,
+                    Role.name == 'implementer'
+                ).all()
                 
                 if implementers:
-                    email_service = EmailService()
-                    email_service.send_cr_approval_notification(cr, implementers)
+                    EmailService.send_cr_approval_notification(cr, implementers)
             except Exception as e:
                 current_app.logger.error(f"Failed to send CR approval notification: {str(e)}")
             
@@ -407,8 +494,7 @@ def approve(cr_id):
             
             # Send email notification to requester
             try:
-                email_service = EmailService()
-                email_service.send_cr_rejection_notification(cr, form.comments.data)
+                EmailService.send_cr_rejection_notification(cr, form.comments.data)
             except Exception as e:
                 current_app.logger.error(f"Failed to send CR rejection notification: {str(e)}")
             
@@ -460,10 +546,10 @@ def implement(cr_id):
     Implements CMSF-015: Track implementation with deadline countdown
     Allows implementers to view files, make changes, and mark CR as implemented
     """
-    cr = ChangeRequest.query.get_or_404(cr_id)
+    cr = _get_cr_or_404(cr_id)
     
     # Check if user has access to this CR's project
-    if not current_user.is_admin() and not current_user.has_project_access(cr.project):
+    if not current_user.is_admin() and cr.project_id not in current_user.active_project_ids:
         flash('You do not have access to this project.', 'danger')
         return redirect(url_for('cr.list_change_requests'))
     
@@ -508,8 +594,7 @@ def implement(cr_id):
             # Send notification to approver for closure (CMSF-019)
             try:
                 if cr.approver:
-                    email_service = EmailService()
-                    email_service.send_implementation_complete_notification(cr)
+                    EmailService.send_implementation_complete_notification(cr)
             except Exception as e:
                 current_app.logger.error(f"Failed to send implementation complete notification: {str(e)}")
             
@@ -528,8 +613,7 @@ def implement(cr_id):
                 if attachment and attachment.change_request_id == cr.id:
                     try:
                         # Save the updated file content
-                        with open(attachment.file_path, 'w') as f:
-                            f.write(file_content)
+                        _atomic_write_text(attachment.file_path, file_content)
                         
                         return jsonify({'success': True, 'message': 'File saved successfully'})
                     except Exception as e:
@@ -548,7 +632,7 @@ def implement(cr_id):
             if not files or files[0].filename == '':
                 return jsonify({'success': False, 'message': 'No files selected'}), 400
             
-            uploaded_count = 0
+            attachments = []
             for file in files:
                 if file and file.filename:
                     try:
@@ -556,29 +640,25 @@ def implement(cr_id):
                         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                         unique_filename = f"{timestamp}_{filename}"
                         
-                        # Create uploads directory if it doesn't exist
-                        upload_dir = os.path.join(current_app.root_path, '..', 'static', 'uploads')
-                        os.makedirs(upload_dir, exist_ok=True)
+                        upload_dir = current_app.config['UPLOAD_FOLDER']
                         
                         filepath = os.path.join(upload_dir, unique_filename)
                         file.save(filepath)
                         
-                        # Create attachment record
-                        attachment = CRAttachment(
-                            change_request_id=cr.id,
-                            filename=unique_filename,
-                            original_filename=filename,
-                            file_path=filepath,
-                            file_size=os.path.getsize(filepath),
-                            uploaded_by_id=current_user.id
-                        )
-                        db.session.add(attachment)
-                        uploaded_count += 1
+                        attachments.append({
+                            'filename': unique_filename,
+                            'original_filename': filename,
+                            'file_path': filepath,
+                            'file_size': os.path.getsize(filepath),
+                            'uploaded_by_id': current_user.id
+                        })
                     except Exception as e:
                         current_app.logger.error(f"Error uploading file {file.filename}: {str(e)}")
                         continue
             
+            uploaded_count = len(attachments)
             if uploaded_count > 0:
+                cr.add_attachments_bulk(attachments)
                 db.session.commit()
                 log_cr_event(
                     AuditEventType.CR_UPDATED,
@@ -624,7 +704,7 @@ def add_rollback_plan(cr_id):
         return redirect(url_for('cr.view', cr_id=cr.id))
     
     # Check status - only draft/submitted CRs can have rollback plan added
-    if cr.status not in [CRStatus.DRAFT, CRStatus.SUBMITTED]:
+    if cr.status not in _ROLLBACK_PLAN_EDITABLE_STATUSES:
         flash('Rollback plan can only be added to draft or submitted CRs.', 'warning')
         return redirect(url_for('cr.view', cr_id=cr.id))
     
@@ -645,9 +725,7 @@ def add_rollback_plan(cr_id):
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             unique_filename = f"rollback_{cr.cr_number}_{timestamp}_{filename}"
             
-            # Create rollback_plans directory if it doesn't exist
-            rollback_dir = os.path.join(current_app.root_path, '..', 'static', 'uploads', 'rollback_plans')
-            os.makedirs(rollback_dir, exist_ok=True)
+            rollback_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'rollback_plans')
             
             filepath = os.path.join(rollback_dir, unique_filename)
             file.save(filepath)
@@ -710,8 +788,7 @@ def close_cr(cr_id):
             
             # Send timeline to admin (CMSF-019)
             try:
-                email_service = EmailService()
-                email_service.send_closure_timeline_email(cr)
+                EmailService.send_closure_timeline_email(cr)
             except Exception as e:
                 current_app.logger.error(f"Failed to send closure timeline email: {str(e)}")
             
@@ -732,23 +809,11 @@ def close_cr(cr_id):
     
     # Convert timeline dict to list for template
     timeline_dict = cr.get_timeline()
-    timeline = []
-    event_mapping = {
-        'created': 'Created',
-        'submitted': 'Submitted',
-        'approved': 'Approved',
-        'implemented': 'Implemented',
-        'closed': 'Closed'
-    }
-    
-    for key, label in event_mapping.items():
-        if timeline_dict.get(key):
-            timeline.append({
-                'event': label,
-                'timestamp': timeline_dict[key]['date'],
-                'user': timeline_dict[key]['user'],
-                'role': timeline_dict[key]['role']
-            })
+    timeline = [
+        {'event': label, 'timestamp': event['date'], 'user': event['user'], 'role': event['role']}
+        for key, label in _CLOSE_EVENTS
+        if (event := timeline_dict.get(key))
+    ]
     
     return render_template('change_requests/close.html', 
                          cr=cr, 
@@ -765,10 +830,18 @@ def download_attachment(attachment_id):
     User must have access to view the associated CR
     """
     from flask import send_file
-    from app.models.change_request import CRAttachment
     
-    attachment = CRAttachment.query.get_or_404(attachment_id)
-    cr = attachment.change_request
+    # Only the columns needed to check access and serve the file
+    attachment = db.session.query(
+        CRAttachment.file_path,
+        CRAttachment.original_filename,
+        CRAttachment.mime_type,
+        CRAttachment.change_request_id
+    ).filter(CRAttachment.id == attachment_id).first() or abort(404)
+    cr = ChangeRequest.query.options(
+        load_only(ChangeRequest.id, ChangeRequest.project_id, ChangeRequest.requester_id, ChangeRequest.status),
+        joinedload(ChangeRequest.project).load_only(Project.id, Project.created_by_id)
+    ).get_or_404(attachment.change_request_id)
     
     # Check if user has access to view this CR
     if not current_user.can_access_cr(cr):
@@ -776,6 +849,23 @@ def download_attachment(attachment_id):
         return redirect(url_for('cr.list_change_requests'))
     
     try:
+        accel_prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+        if accel_prefix:
+            # nginx serves the file itself from its internal location
+            if not os.path.isfile(attachment.file_path):
+                raise FileNotFoundError(attachment.file_path)
+            relative_path = os.path.relpath(attachment.file_path, current_app.config['UPLOAD_FOLDER'])
+            response = make_response('')
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(relative_path)}"
+            response.headers.set('Content-Disposition', 'attachment', filename=attachment.original_filename)
+            response.headers['Content-Type'] = (
+                attachment.mime_type
+                or mimetypes.guess_type(attachment.original_filename)[0]
+                or 'application/octet-stream'
+            )
+            return response
+        
+        # send_file emits X-Sendfile itself when USE_X_SENDFILE is enabled
         return send_file(
             attachment.file_path,
             as_attachment=True,
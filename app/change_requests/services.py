@@ -1,6 +1,40 @@
-from ..models.change_request import ChangeRequest
+from ..extensions import db
+from ..models.change_request import ChangeRequest, CRComment
 
 
-def create_change_request(title, description, created_by=None):
-    cr = ChangeRequest(title=title, description=description, created_by=created_by)
+def create_change_request(title, description, created_by=None, attachments=None, comments=None, **fields):
+    """
+    Build a change request, optionally with attachments and comments
+
+    Attachment and comment rows are written with bulk inserts; the caller
+    commits once at the end of the request.
+
+    Args:
+        title: CR title
+        description: CR description
+        created_by: Requesting User object
+        attachments: List of dicts of CRAttachment column values
+        comments: List of dicts with 'user_id' and 'comment' keys
+        **fields: Any other ChangeRequest column values
+
+    Returns:
+        ChangeRequest: The new (pending) CR
+    """
+    if created_by is not None:
+        fields.setdefault('requester_id', created_by.id)
+        fields.setdefault('requester_email', created_by.email)
+    cr = ChangeRequest(title=title, description=description, **fields)
+
+    if attachments or comments:
+        db.session.add(cr)
+        db.session.flush()  # Get CR ID
+
+        cr.add_attachments_bulk(attachments)
+        if comments:
+            db.session.bulk_save_objects(
+                [CRComment(change_request_id=cr.id, **comment) for comment in comments],
+                return_defaults=False
+            )
+            db.session.expire(cr, ['comments'])
+
     return cr
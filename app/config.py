@@ -14,11 +14,31 @@ class BaseConfig:
     # Email Configuration
     SMTP_SERVER = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
     SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
+    SMTP_TIMEOUT = int(os.environ.get('SMTP_TIMEOUT', 10))  # seconds, per socket operation
+    SMTP_KEEPALIVE = int(os.environ.get('SMTP_KEEPALIVE', 60))  # seconds an email worker keeps an idle connection
     SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
     SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
     SMTP_FROM_EMAIL = os.environ.get('SMTP_FROM_EMAIL', 'noreply@cms.local')
     SMTP_FROM_NAME = 'Change Management System'
     BASE_URL = os.environ.get('BASE_URL', 'http://127.0.0.1:5000')
+    # Send mail from a background thread pool instead of the request thread
+    EMAIL_ASYNC = os.environ.get('EMAIL_ASYNC', 'true').lower() == 'true'
+    EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', 4))
+    # Background sends retry transient SMTP failures, doubling the delay (seconds)
+    EMAIL_MAX_RETRIES = int(os.environ.get('EMAIL_MAX_RETRIES', 3))
+    EMAIL_RETRY_BACKOFF = int(os.environ.get('EMAIL_RETRY_BACKOFF', 2))
+    
+    # Audit log batching: queued entries are written once this many are
+    # pending or the interval (seconds) since the last write has passed
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL = int(os.environ.get('AUDIT_FLUSH_INTERVAL', 5))
+    # A failing batch is retried this many times before it is dropped, and the
+    # queue keeps at most this many entries (oldest are dropped first)
+    AUDIT_MAX_RETRIES = int(os.environ.get('AUDIT_MAX_RETRIES', 3))
+    AUDIT_QUEUE_MAX = int(os.environ.get('AUDIT_QUEUE_MAX', 10000))
+    
+    # SQLite only: WAL journaling with synchronous=NORMAL (see set_sqlite_pragmas)
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', 'true').lower() == 'true'
 
 
 class DevelopmentConfig(BaseConfig):
@@ -34,6 +54,9 @@ class TestingConfig(BaseConfig):
     TESTING = True
     ENFORCE_HTTPS = False
     WTF_CSRF_ENABLED = False
+    AUDIT_BATCH_SIZE = 1  # Write audit logs immediately in tests
+    EMAIL_ASYNC = False  # Send emails inline so tests can inspect the SMTP calls
+    SQLALCHEMY_RAISELOAD = True  # Fail on unplanned lazy loads from current_user
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "TEST_DATABASE_URL", "sqlite:///:memory:"
     )
@@ -43,6 +66,22 @@ class ProductionConfig(BaseConfig):
     DEBUG = False
     ENFORCE_HTTPS = True
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
+    
+    # Connection pool sized for concurrent workers; connections are recycled
+    # before server-side idle timeouts instead of being pinged on checkout
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': False,
+    }
+    
+    # Let the front-end web server stream attachment downloads from disk.
+    # Apache/Lighttpd: set USE_X_SENDFILE=true (handled by Flask's send_file).
+    # nginx: set X_ACCEL_REDIRECT_PREFIX to an `internal` location that maps
+    # to the upload folder, e.g. /protected/
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
 
 
 config_by_name = {
@@ -1,3 +1,5 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
@@ -11,3 +13,15 @@ login_manager = LoginManager()
 csrf = CSRFProtect()
 limiter = Limiter(key_func=get_remote_address, default_limits=["200 per day", "50 per hour"])
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Use WAL journaling on SQLite (dev/test) so writes don't fsync every commit
+    Registered as a connect listener on the app's engine when SQLITE_WAL is on;
+    connections from any other driver are left alone.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
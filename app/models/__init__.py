@@ -5,9 +5,9 @@ Exports all database models for easy import
 from .user import User
 from .user_invitation import UserInvitation
 from .role import Role, Permission
-from .change_request import ChangeRequest, CRStatus, CRPriority, CRRiskLevel, CRAttachment, CRComment
+from .change_request import ChangeRequest, CRStatus, CRPriority, CRRiskLevel, CRAttachment, CRComment, CRNumberCounter
 from .project import Project, ProjectMembership
-from .audit import AuditLog
+from .audit import AuditLog, UserAgent
 
 __all__ = [
     'User',
@@ -20,7 +20,9 @@ __all__ = [
     'CRRiskLevel',
     'CRAttachment',
     'CRComment',
+    'CRNumberCounter',
     'Project',
     'ProjectMembership',
     'AuditLog',
+    'UserAgent',
 ]
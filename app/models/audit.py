@@ -3,8 +3,128 @@ Audit Log Model
 Implements CMS-F-013, CMS-F-014, CMS-SR-004
 Immutable audit trails for compliance
 """
-from datetime import datetime, timezone
+import hashlib
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from app.extensions import db
+from app.models.timestamps import UTC, utcnow
+
+
+# Audit entries waiting to be written in one batch (see AuditLog.enqueue)
+_pending_logs = deque()
+
+# Columns serialized by AuditLog.to_dict (timestamp is formatted separately)
+_AUDIT_FIELDS = (
+    'id', 'event_type', 'event_category', 'event_description',
+    'user_id', 'username', 'ip_address', 'user_agent',
+    'request_method', 'request_path', 'resource_type', 'resource_id',
+    'status_code', 'success', 'error_message', 'extra_data',
+)
+_get_audit_fields = attrgetter(*_AUDIT_FIELDS)
+
+
+class UserAgent(db.Model):
+    """
+    Distinct User-Agent strings referenced by audit logs
+    Stored once and shared, since the same few browsers appear on most rows
+    """
+    __tablename__ = 'user_agents'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ua_hash = db.Column(db.String(40), unique=True, nullable=False, index=True)  # SHA-1 hex of ua_text
+    ua_text = db.Column(db.String(256), nullable=False)
+    
+    def __repr__(self):
+        return f'<UserAgent {self.ua_text[:32]}>'
+    
+    @staticmethod
+    def get_or_create_id(ua_text):
+        """
+        Get the id of a User-Agent string, inserting it if unseen
+        Ids are cached per process, so known agents cost no query
+        
+        Args:
+            ua_text: User-Agent header value (already truncated to 256 chars)
+        
+        Returns:
+            int or None: UserAgent id (None for an empty header)
+        """
+        if not ua_text:
+            return None
+        return _user_agent_id(ua_text)
+
+
+def _resolve_user_agent_id(executor, ua_text):
+    """
+    Look up or insert a User-Agent row
+    
+    Args:
+        executor: Session or Connection whose transaction the row joins
+        ua_text: User-Agent header value
+    
+    Returns:
+        tuple: (UserAgent id, whether this call inserted the row)
+    """
+    table = UserAgent.__table__
+    ua_hash = hashlib.sha1(ua_text.encode('utf-8')).hexdigest()
+    lookup = select(table.c.id).where(table.c.ua_hash == ua_hash)
+    ua_id = executor.execute(lookup).scalar()
+    if ua_id is not None:
+        return ua_id, False
+    try:
+        with executor.begin_nested():
+            result = executor.execute(table.insert().values(ua_hash=ua_hash, ua_text=ua_text))
+        return result.inserted_primary_key[0], True
+    except IntegrityError:
+        # Another worker inserted the same agent first
+        return executor.execute(lookup).scalar(), False
+
+
+@lru_cache(maxsize=4096)
+def _user_agent_id(ua_text):
+    """Look up or insert a User-Agent row in the current session transaction"""
+    ua_id, inserted = _resolve_user_agent_id(db.session, ua_text)
+    if inserted:
+        # The id only survives if this transaction commits
+        db.session.info['user_agent_inserted'] = True
+    return ua_id
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_user_agent_ids(session):
+    """Cached ids may refer to rows inserted by the transaction just rolled back"""
+    if session.info.pop('user_agent_inserted', False):
+        _user_agent_id.cache_clear()
+
+
+@event.listens_for(Session, 'after_commit')
+def _keep_user_agent_ids(session):
+    """Inserted User-Agent rows are durable once committed"""
+    session.info.pop('user_agent_inserted', None)
+
+
+def _with_user_agent_id(fields, user_agent_ids=None):
+    """
+    Copy of audit log fields with the User-Agent text replaced by its id
+    
+    Args:
+        fields: Audit log fields as built by AuditLog._build_fields
+        user_agent_ids: Optional mapping of User-Agent text to id already
+            resolved by the caller (default: resolve through the session)
+    """
+    fields = dict(fields)
+    ua_text = fields.pop('user_agent', None)
+    if user_agent_ids is not None:
+        fields['user_agent_id'] = user_agent_ids.get(ua_text)
+    else:
+        fields['user_agent_id'] = UserAgent.get_or_create_id(ua_text)
+    return fields
 
 
 class AuditLog(db.Model):
@@ -29,7 +149,8 @@ class AuditLog(db.Model):
     
     # Request information
     ip_address = db.Column(db.String(45))  # IPv6 support
-    user_agent = db.Column(db.String(256))
+    user_agent_id = db.Column(db.Integer, db.ForeignKey('user_agents.id'))
+    user_agent_entry = db.relationship('UserAgent', lazy='selectin')
     request_method = db.Column(db.String(10))
     request_path = db.Column(db.String(256))
     
@@ -46,32 +167,62 @@ class AuditLog(db.Model):
     extra_data = db.Column(db.JSON)
     
     # Timestamp (immutable, timezone-aware)
-    timestamp = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+    timestamp = db.Column(db.DateTime, nullable=False, server_default=utcnow(), index=True)
     
     def __repr__(self):
         return f'<AuditLog {self.event_type} by {self.username} at {self.timestamp}>'
     
+    @property
+    def user_agent(self):
+        """User-Agent string of the request that produced this entry"""
+        return self.user_agent_entry.ua_text if self.user_agent_entry else None
+    
     def to_dict(self):
         """Convert audit log to dictionary"""
-        return {
-            'id': self.id,
-            'event_type': self.event_type,
-            'event_category': self.event_category,
-            'event_description': self.event_description,
-            'user_id': self.user_id,
-            'username': self.username,
-            'ip_address': self.ip_address,
-            'user_agent': self.user_agent,
-            'request_method': self.request_method,
-            'request_path': self.request_path,
-            'resource_type': self.resource_type,
-            'resource_id': self.resource_id,
-            'status_code': self.status_code,
-            'success': self.success,
-            'error_message': self.error_message,
-            'extra_data': self.extra_data,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        data = dict(zip(_AUDIT_FIELDS, _get_audit_fields(self)))
+        data['timestamp'] = self.timestamp.isoformat() if self.timestamp else None
+        return data
+    
+    @staticmethod
+    def _build_fields(event_type, event_category, user=None, ip_address=None,
+                      description=None, resource_type=None, resource_id=None,
+                      success=True, metadata=None, request=None):
+        """
+        Build the column values for an audit log entry
+        Every entry carries the same keys (None when unknown), since a batch
+        insert compiles its statement from the first row's keys.
+        """
+        fields = {
+            'event_type': event_type,
+            'event_category': event_category,
+            'event_description': description,
+            'success': success,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'extra_data': metadata or {},
+            'user_id': None,
+            'username': None,
+            'ip_address': ip_address,
+            'user_agent': None,
+            'request_method': None,
+            'request_path': None,
         }
+        
+        # User information
+        if user:
+            fields['user_id'] = user.id
+            fields['username'] = user.username
+        
+        # Request information
+        if request:
+            # Read straight from the WSGI environ; only slice over-long agents
+            user_agent = request.environ.get('HTTP_USER_AGENT', '')
+            fields['ip_address'] = request.environ.get('REMOTE_ADDR')
+            fields['user_agent'] = user_agent if len(user_agent) <= 256 else user_agent[:256]
+            fields['request_method'] = request.method
+            fields['request_path'] = request.path
+        
+        return fields
     
     @staticmethod
     def create_log(event_type, event_category, user=None, ip_address=None,
@@ -95,34 +246,83 @@ class AuditLog(db.Model):
         Returns:
             AuditLog: Created audit log entry
         """
-        log = AuditLog(
-            event_type=event_type,
-            event_category=event_category,
-            event_description=description,
-            success=success,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            extra_data=metadata or {}
-        )
-        
-        # User information
-        if user:
-            log.user_id = user.id
-            log.username = user.username
-        
-        # Request information
-        if request:
-            log.ip_address = request.remote_addr
-            log.user_agent = request.headers.get('User-Agent', '')[:256]
-            log.request_method = request.method
-            log.request_path = request.path
-        elif ip_address:
-            log.ip_address = ip_address
+        log = AuditLog(**_with_user_agent_id(AuditLog._build_fields(
+            event_type, event_category, user=user, ip_address=ip_address,
+            description=description, resource_type=resource_type,
+            resource_id=resource_id, success=success, metadata=metadata,
+            request=request
+        )))
         
         db.session.add(log)
         db.session.commit()
         
         return log
+    
+    @staticmethod
+    def enqueue(event_type, event_category, **kwargs):
+        """
+        Queue an audit log entry to be written with the next batch
+        Use for high-volume, non-critical events (e.g. CR views);
+        security-critical events should keep using create_log.
+        
+        Args:
+            event_type: Type of event
+            event_category: Category of event
+            **kwargs: Same keyword arguments as create_log
+        """
+        fields = AuditLog._build_fields(event_type, event_category, **kwargs)
+        # Record the event time now rather than when the batch is written
+        fields['timestamp'] = datetime.now(UTC)
+        # Bound the queue while writes are failing: the oldest entry makes way
+        if len(_pending_logs) >= current_app.config.get('AUDIT_QUEUE_MAX', 10000):
+            dropped = _pending_logs.popleft()
+            current_app.logger.error(
+                f"Audit queue full, dropped {dropped['event_type']} entry from {dropped['timestamp']}"
+            )
+        _pending_logs.append(fields)
+    
+    @staticmethod
+    def pending_count():
+        """Number of queued audit log entries not yet written"""
+        return len(_pending_logs)
+    
+    @staticmethod
+    def flush_pending(limit=None, requeue=True):
+        """
+        Write queued audit log entries in a single batch insert
+        The batch is committed on its own connection, so flushing never
+        commits (or flushes) whatever the request session has pending.
+        
+        Args:
+            limit: Maximum number of entries to write (default: all)
+            requeue: Put the batch back at the head of the queue if the
+                write fails (False drops it)
+        
+        Returns:
+            int: Number of entries written
+        """
+        batch = []
+        while _pending_logs and (limit is None or len(batch) < limit):
+            batch.append(_pending_logs.popleft())
+        
+        if batch:
+            try:
+                with db.engine.begin() as conn:
+                    # User-Agent ids are resolved once per distinct agent in the batch;
+                    # a Core insert with a list of rows runs as one executemany
+                    agents = {fields['user_agent'] for fields in batch if fields.get('user_agent')}
+                    user_agent_ids = {ua: _resolve_user_agent_id(conn, ua)[0] for ua in agents}
+                    conn.execute(
+                        AuditLog.__table__.insert(),
+                        [_with_user_agent_id(fields, user_agent_ids) for fields in batch]
+                    )
+            except Exception:
+                if requeue:
+                    # Put the entries back so the next flush can retry them
+                    _pending_logs.extendleft(reversed(batch))
+                raise
+        
+        return len(batch)
 
 
 # Event type constants for consistency
@@ -2,12 +2,26 @@
 Change Request Model
 Implements CMS-F-005, CMS-F-006, CMS-F-007
 """
-from datetime import datetime, timezone
+from datetime import datetime, timedelta
 from enum import Enum
+from functools import cached_property
+from sqlalchemy import String, bindparam, text, update
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import db
+from app.models.timestamps import UTC, utcnow
 
 
-class CRStatus(str, Enum):
+class _CREnum(str, Enum):
+    """Base for the CR enums: adds an upper-case display label computed once per member"""
+    
+    @cached_property
+    def label(self):
+        """Upper-cased value, e.g. 'IN_PROGRESS'"""
+        return self.value.upper()
+
+
+class CRStatus(_CREnum):
     """Change Request status enumeration"""
     DRAFT = 'draft'
     SUBMITTED = 'submitted'
@@ -20,7 +34,7 @@ class CRStatus(str, Enum):
     ROLLED_BACK = 'rolled_back'
 
 
-class CRPriority(str, Enum):
+class CRPriority(_CREnum):
     """Change Request priority enumeration"""
     LOW = 'low'
     MEDIUM = 'medium'
@@ -28,13 +42,72 @@ class CRPriority(str, Enum):
     CRITICAL = 'critical'
 
 
-class CRRiskLevel(str, Enum):
+class CRRiskLevel(_CREnum):
     """Change Request risk level enumeration"""
     LOW = 'low'
     MEDIUM = 'medium'
     HIGH = 'high'
 
 
+class StrEnumType(TypeDecorator):
+    """
+    Store a str Enum as its plain VARCHAR value
+    Avoids native database enum types (and their ALTER TYPE migrations)
+    while still handing Enum members to application code
+    """
+    impl = String(24)
+    cache_ok = True
+    
+    def __init__(self, enum_class, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.enum_class(value).value
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Rows still holding old member names ('APPROVED') raise here; run
+        # scripts/backfill_cr_enum_values.py to convert them
+        return self.enum_class(value)
+
+
+def _enum_check(column, enum_class):
+    """CHECK constraint limiting a column to the values of an Enum"""
+    values = ', '.join(f"'{member.value}'" for member in enum_class)
+    return db.CheckConstraint(f'{column} IN ({values})', name=f'ck_cr_{column}')
+
+
+class CRNumberCounter(db.Model):
+    """Per-day sequence used to allocate CR numbers"""
+    __tablename__ = 'cr_number_counters'
+    
+    day = db.Column(db.Date, primary_key=True)
+    seq = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CRNumberCounter {self.day}: {self.seq}>'
+
+
+# INSERT ... ON CONFLICT ... RETURNING is supported by both SQLite (3.35+) and PostgreSQL.
+# The day's first insert continues after any CR numbers already issued for it
+# (e.g. before the counter table existed); XXXX starts at character 13
+_NEXT_CR_SEQ_SQL = text(
+    "INSERT INTO cr_number_counters (day, seq) VALUES (:day, ("
+    "SELECT COALESCE(MAX(CAST(SUBSTR(cr_number, 13) AS INTEGER)), 0) + 1 "
+    "FROM change_requests WHERE cr_number LIKE :pattern)) "
+    "ON CONFLICT (day) DO UPDATE SET seq = cr_number_counters.seq + 1 "
+    "RETURNING seq"
+).bindparams(bindparam('day', type_=db.Date))
+
+# (date, 'CR-YYYYMMDD') for the day CR numbers were last generated; replaced
+# as a whole so readers never pair one day's date with another day's prefix
+_cr_prefix_cache = (None, None)
+
+
 class ChangeRequest(db.Model):
     """
     Change Request model
@@ -58,9 +131,9 @@ class ChangeRequest(db.Model):
     impact_assessment = db.Column(db.Text)
     
     # Status and priority
-    status = db.Column(db.Enum(CRStatus), default=CRStatus.DRAFT, nullable=False, index=True)
-    priority = db.Column(db.Enum(CRPriority), default=CRPriority.MEDIUM, nullable=False)
-    risk_level = db.Column(db.Enum(CRRiskLevel), default=CRRiskLevel.LOW, nullable=False)
+    status = db.Column(StrEnumType(CRStatus), default=CRStatus.DRAFT, nullable=False)
+    priority = db.Column(StrEnumType(CRPriority), default=CRPriority.MEDIUM, nullable=False)
+    risk_level = db.Column(StrEnumType(CRRiskLevel), default=CRRiskLevel.LOW, nullable=False)
     
     # Users and roles
     requester_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -72,6 +145,13 @@ class ChangeRequest(db.Model):
     implementer_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     implementer = db.relationship('User', foreign_keys=[implementer_id])
     
+    # Denormalized participant emails, written when each user is assigned,
+    # so timelines and notifications don't need to load the users
+    requester_email = db.Column(db.String(120))
+    approver_email = db.Column(db.String(120))
+    implementer_email = db.Column(db.String(120))
+    closed_by_email = db.Column(db.String(120))
+    
     # Dates and deadlines
     approved_date = db.Column(db.DateTime)
     implementation_date = db.Column(db.DateTime)
@@ -102,8 +182,8 @@ class ChangeRequest(db.Model):
     closed_by = db.relationship('User', foreign_keys=[closed_by_id])
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     submitted_at = db.Column(db.DateTime)
     
     # Relationships
@@ -112,9 +192,85 @@ class ChangeRequest(db.Model):
     comments = db.relationship('CRComment', back_populates='change_request',
                               cascade='all, delete-orphan', order_by='CRComment.created_at')
     
+    # Composite indexes for dashboard filters and SLA sweeps; status leads
+    # two of them, so it needs no standalone index. Enum columns are
+    # VARCHARs restricted by CHECK constraints
+    __table_args__ = (
+        db.Index('ix_cr_project_status', 'project_id', 'status'),
+        db.Index('ix_cr_requester_status', 'requester_id', 'status'),
+        db.Index('ix_cr_status_deadline', 'status', 'implementation_deadline'),
+        db.Index('ix_cr_sla_scan', 'status', 'sla_warning_sent', 'implementation_deadline'),
+        _enum_check('status', CRStatus),
+        _enum_check('priority', CRPriority),
+        _enum_check('risk_level', CRRiskLevel),
+    )
+    
+    # Cannot edit approved, implemented, closed, rejected, or rolled back CRs
+    # Once approved, no one can edit - not even admins
+    _NON_EDITABLE_STATUSES = frozenset({
+        CRStatus.APPROVED,
+        CRStatus.IMPLEMENTED,
+        CRStatus.CLOSED,
+        CRStatus.REJECTED,
+        CRStatus.ROLLED_BACK,
+    })
+    
+    # Statuses whose implementation deadline is still tracked (CMSF-015)
+    _SLA_TRACKED_STATUSES = (CRStatus.APPROVED, CRStatus.IN_PROGRESS, CRStatus.IMPLEMENTED)
+    
     def __repr__(self):
         return f'<ChangeRequest {self.cr_number}>'
     
+    @classmethod
+    def query_for_list(cls):
+        """
+        Base query for pages that list CRs
+        Loads the related users and project in batched selects instead of per row
+        
+        Returns:
+            Query: ChangeRequest query with eager-load options applied
+        """
+        return cls.query.options(
+            selectinload(cls.requester),
+            selectinload(cls.approver),
+            selectinload(cls.implementer),
+            selectinload(cls.closed_by),
+            selectinload(cls.project),
+        )
+    
+    @classmethod
+    def query_for_email(cls):
+        """
+        Base query for CR notification emails
+        Joins in the project and the users the email templates read, in one SELECT
+        
+        Returns:
+            Query: ChangeRequest query with eager-load options applied
+        """
+        from app.models.user import User
+        # The templates never read user roles, so skip User.role's default join
+        users = (cls.requester, cls.approver, cls.implementer, cls.closed_by)
+        return cls.query.options(
+            joinedload(cls.project),
+            *(joinedload(user).lazyload(User.role) for user in users)
+        )
+    
+    @classmethod
+    def stream_for_email(cls, cr_ids, batch_size=500):
+        """
+        Iterate CRs with their email relationships loaded, batch_size rows at a time
+        
+        Args:
+            cr_ids: IDs of the CRs to load
+            batch_size: Rows fetched per round trip
+        
+        Returns:
+            Iterator of ChangeRequest objects
+        """
+        if not cr_ids:
+            return iter(())
+        return cls.query_for_email().filter(cls.id.in_(cr_ids)).yield_per(batch_size)
+    
     @staticmethod
     def generate_cr_number():
         """
@@ -124,15 +280,22 @@ class ChangeRequest(db.Model):
         Returns:
             str: Unique CR number
         """
-        today = datetime.now(timezone.utc).strftime('%Y%m%d')
-        prefix = f'CR-{today}'
+        global _cr_prefix_cache
         
-        # Get count of CRs created today
-        count = ChangeRequest.query.filter(
-            ChangeRequest.cr_number.like(f'{prefix}%')
-        ).count()
+        today = datetime.now(UTC).date()
+        # Format the date prefix only when the day changes
+        day, prefix = _cr_prefix_cache
+        if day != today:
+            prefix = f"CR-{today.strftime('%Y%m%d')}"
+            _cr_prefix_cache = (today, prefix)
         
-        return f'{prefix}-{count + 1:04d}'
+        # Atomically allocate today's next sequence number; the upsert's row
+        # lock serializes concurrent requesters so numbers are never reused
+        seq = db.session.execute(
+            _NEXT_CR_SEQ_SQL, {'day': today, 'pattern': f'{prefix}-%'}
+        ).scalar_one()
+        
+        return f'{prefix}-{seq:04d}'
     
     def can_edit(self, user):
         """
@@ -145,18 +308,8 @@ class ChangeRequest(db.Model):
         Returns:
             bool: True if user can edit
         """
-        # Cannot edit approved, implemented, closed, rejected, or rolled back CRs
-        # Once approved, no one can edit - not even admins
-        non_editable_statuses = [
-            CRStatus.APPROVED,
-            CRStatus.IMPLEMENTED,
-            CRStatus.CLOSED,
-            CRStatus.REJECTED,
-            CRStatus.ROLLED_BACK
-        ]
-        
         # No one can edit after approval
-        if self.status in non_editable_statuses:
+        if self.status in self._NON_EDITABLE_STATUSES:
             return False
         
         # Before approval: Requester can edit their own CR
@@ -169,6 +322,21 @@ class ChangeRequest(db.Model):
         
         return False
     
+    def add_attachments_bulk(self, attachments):
+        """
+        Insert several attachment rows in one executemany round-trip
+        
+        Args:
+            attachments: List of dicts of CRAttachment column values
+        """
+        if not attachments:
+            return
+        for attachment in attachments:
+            attachment['change_request_id'] = self.id
+        db.session.bulk_insert_mappings(CRAttachment, attachments)
+        # Reload the collection on next access so it includes the new rows
+        db.session.expire(self, ['attachments'])
+    
     def can_submit(self, user):
         """Check if user can submit this CR"""
         return self.requester_id == user.id and self.status == CRStatus.DRAFT
@@ -185,9 +353,9 @@ class ChangeRequest(db.Model):
         """Submit CR for approval"""
         if self.status == CRStatus.DRAFT:
             self.status = CRStatus.PENDING_APPROVAL
-            self.submitted_at = datetime.now(timezone.utc)
+            self.submitted_at = datetime.now(UTC)
             # Set SLA deadline (example: 5 business days)
-            self.sla_deadline = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59)
+            self.sla_deadline = datetime.now(UTC).replace(hour=23, minute=59, second=59)
     
     def approve(self, approver, comments=None):
         """
@@ -199,7 +367,8 @@ class ChangeRequest(db.Model):
         """
         self.status = CRStatus.APPROVED
         self.approver_id = approver.id
-        self.approved_date = datetime.now(timezone.utc)
+        self.approver_email = approver.email
+        self.approved_date = datetime.now(UTC)
         self.approval_comments = comments
     
     def reject(self, approver, reason):
@@ -212,7 +381,8 @@ class ChangeRequest(db.Model):
         """
         self.status = CRStatus.REJECTED
         self.approver_id = approver.id
-        self.approved_date = datetime.now(timezone.utc)
+        self.approver_email = approver.email
+        self.approved_date = datetime.now(UTC)
         self.rejection_reason = reason
     
     def start_implementation(self, implementer):
@@ -224,7 +394,8 @@ class ChangeRequest(db.Model):
         """
         self.status = CRStatus.IN_PROGRESS
         self.implementer_id = implementer.id
-        self.implementation_date = datetime.now(timezone.utc)
+        self.implementer_email = implementer.email
+        self.implementation_date = datetime.now(UTC)
     
     def complete_implementation(self):
         """Mark CR as implemented"""
@@ -240,8 +411,9 @@ class ChangeRequest(db.Model):
             notes: Detailed closure notes
         """
         self.status = CRStatus.CLOSED
-        self.closed_date = datetime.now(timezone.utc)
+        self.closed_date = datetime.now(UTC)
         self.closed_by_id = user.id
+        self.closed_by_email = user.email
         self.closure_comments = comments
         self.closure_notes = notes
     
@@ -255,7 +427,7 @@ class ChangeRequest(db.Model):
             reason: Rollback reason
         """
         self.status = CRStatus.ROLLED_BACK
-        self.rolled_back_at = datetime.now(timezone.utc)
+        self.rolled_back_at = datetime.now(UTC)
         self.rolled_back_by_id = user.id
         self.rollback_reason = reason
     
@@ -267,7 +439,7 @@ class ChangeRequest(db.Model):
             bool: True if deadline breached
         """
         if self.implementation_deadline and not self.is_sla_breached:
-            if datetime.now(timezone.utc) > self.implementation_deadline:
+            if datetime.now(UTC) > self.implementation_deadline:
                 self.is_sla_breached = True
                 return True
         return False
@@ -283,8 +455,8 @@ class ChangeRequest(db.Model):
             # Make implementation_deadline timezone-aware if it's naive
             deadline = self.implementation_deadline
             if deadline.tzinfo is None:
-                deadline = deadline.replace(tzinfo=timezone.utc)
-            return deadline - datetime.now(timezone.utc)
+                deadline = deadline.replace(tzinfo=UTC)
+            return deadline - datetime.now(UTC)
         return None
     
     def is_deadline_warning_needed(self):
@@ -300,6 +472,86 @@ class ChangeRequest(db.Model):
                 return True
         return False
     
+    @classmethod
+    def sweep_sla_breaches(cls, now=None):
+        """
+        Flag every tracked CR past its deadline with a single UPDATE (CMSF-015)
+        
+        Args:
+            now: Naive UTC datetime to compare against (default: current time)
+        
+        Returns:
+            list: IDs of CRs newly marked as breached
+        """
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        breached_ids = db.session.execute(
+            update(cls)
+            .where(
+                cls.status.in_(cls._SLA_TRACKED_STATUSES),
+                cls.implementation_deadline < now,
+                cls.is_sla_breached.is_(False)
+            )
+            .values(is_sla_breached=True)
+            .returning(cls.id)
+        ).scalars().all()
+        db.session.commit()
+        return breached_ids
+    
+    @classmethod
+    def sla_warning_criteria(cls, now=None):
+        """
+        WHERE clauses for tracked CRs due within 24 hours that have not been warned yet (CMSF-016)
+        
+        Args:
+            now: Naive UTC datetime to compare against (default: current time)
+        
+        Returns:
+            tuple: SQL expressions to pass to filter()/where()
+        """
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        return (
+            cls.status.in_(cls._SLA_TRACKED_STATUSES),
+            cls.implementation_deadline > now,
+            cls.implementation_deadline <= now + timedelta(hours=24),
+            cls.sla_warning_sent.is_(False),
+            cls.is_sla_breached.is_(False),
+        )
+    
+    @classmethod
+    def sweep_warning_candidates(cls, now=None):
+        """
+        Tracked CRs due within 24 hours that have not been warned yet (CMSF-016)
+        
+        Args:
+            now: Naive UTC datetime to compare against (default: current time)
+        
+        Returns:
+            list: ChangeRequest objects needing a deadline warning
+        """
+        return cls.query.filter(*cls.sla_warning_criteria(now)).all()
+    
+    @classmethod
+    def mark_sla_warning_sent(cls, cr_ids):
+        """
+        Set sla_warning_sent on many CRs with one UPDATE and one commit
+        Only rows still unflagged are claimed, so when several workers sweep
+        at once each CR is returned to exactly one of them.
+        
+        Args:
+            cr_ids: IDs of CRs whose warning or breach email is about to go out
+        
+        Returns:
+            list: IDs this call flagged
+        """
+        claimed_ids = db.session.execute(
+            update(cls)
+            .where(cls.id.in_(cr_ids), cls.sla_warning_sent.is_(False))
+            .values(sla_warning_sent=True)
+            .returning(cls.id)
+        ).scalars().all() if cr_ids else []
+        db.session.commit()
+        return claimed_ids
+    
     def get_timeline(self):
         """
         Get complete CR timeline for closure email
@@ -307,30 +559,32 @@ class ChangeRequest(db.Model):
         Returns:
             dict: Timeline with all key events
         """
+        # Rows created before the email columns existed fall back to the users
+        requester_email = self.requester_email or (self.requester.email if self.requester else None)
         return {
             'created': {
                 'date': self.created_at,
-                'user': self.requester.email if self.requester else None,
+                'user': requester_email,
                 'role': 'Requester'
             },
             'submitted': {
                 'date': self.submitted_at,
-                'user': self.requester.email if self.requester else None,
+                'user': requester_email,
                 'role': 'Requester'
             } if self.submitted_at else None,
             'approved': {
                 'date': self.approved_date,
-                'user': self.approver.email if self.approver else None,
+                'user': self.approver_email or (self.approver.email if self.approver else None),
                 'role': 'Approver'
             } if self.approved_date else None,
             'implemented': {
                 'date': self.implementation_date,
-                'user': self.implementer.email if self.implementer else None,
+                'user': self.implementer_email or (self.implementer.email if self.implementer else None),
                 'role': 'Implementer'
             } if self.implementation_date else None,
             'closed': {
                 'date': self.closed_date,
-                'user': self.closed_by.email if self.closed_by else None,
+                'user': self.closed_by_email or (self.closed_by.email if self.closed_by else None),
                 'role': 'Closer'
             } if self.closed_date else None,
         }
@@ -370,7 +624,7 @@ class CRAttachment(db.Model):
     
     uploaded_by_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     uploaded_by = db.relationship('User')
-    uploaded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    uploaded_at = db.Column(db.DateTime, server_default=utcnow())
     
     def __repr__(self):
         return f'<CRAttachment {self.original_filename}>'
@@ -388,7 +642,7 @@ class CRComment(db.Model):
     user = db.relationship('User')
     
     comment = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, server_default=utcnow())
     
     def __repr__(self):
         return f'<CRComment by {self.user.username}>'
\ No newline at end of file
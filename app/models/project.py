@@ -2,8 +2,8 @@
 Project Model
 Multi-project support with user role assignments
 """
-from datetime import datetime, timezone
 from app.extensions import db
+from app.models.timestamps import utcnow
 
 
 class Project(db.Model):
@@ -26,8 +26,8 @@ class Project(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     change_requests = db.relationship('ChangeRequest', back_populates='project', cascade='all, delete-orphan')
@@ -38,16 +38,34 @@ class Project(db.Model):
     
     def get_members_by_role(self, role_name):
         """Get all users with a specific role in this project"""
-        return [m.user for m in self.members if m.role.name == role_name and m.is_active]
+        from app.models.user import User
+        from app.models.role import Role
+        return User.query.join(
+            ProjectMembership, ProjectMembership.user_id == User.id
+        ).join(
+            Role, Role.id == ProjectMembership.role_id
+        ).filter(
+            ProjectMembership.project_id == self.id,
+            ProjectMembership.is_active == True,
+            Role.name == role_name
+        ).all()
     
     def has_member(self, user):
         """Check if user is a member of this project"""
-        return any(m.user_id == user.id and m.is_active for m in self.members)
+        return db.session.query(ProjectMembership.id).filter_by(
+            project_id=self.id, user_id=user.id, is_active=True
+        ).first() is not None
     
     def get_user_role(self, user):
         """Get user's role in this project"""
-        membership = next((m for m in self.members if m.user_id == user.id and m.is_active), None)
-        return membership.role if membership else None
+        from app.models.role import Role
+        return Role.query.join(
+            ProjectMembership, ProjectMembership.role_id == Role.id
+        ).filter(
+            ProjectMembership.project_id == self.id,
+            ProjectMembership.user_id == user.id,
+            ProjectMembership.is_active == True
+        ).first()
     
     def to_dict(self):
         """Convert project to dictionary"""
@@ -80,7 +98,7 @@ class ProjectMembership(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     
     # Timestamps
-    joined_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    joined_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
     
     # Relationships
     project = db.relationship('Project', back_populates='members')
@@ -90,6 +108,7 @@ class ProjectMembership(db.Model):
     # Unique constraint: one user can only have one active role per project
     __table_args__ = (
         db.UniqueConstraint('project_id', 'user_id', name='unique_project_user'),
+        db.Index('ix_pm_user_active_project', 'user_id', 'is_active', 'project_id'),
     )
     
     def __repr__(self):
@@ -2,9 +2,59 @@
 Role and Permission Models
 Implements CMS-F-003: Role-based access control
 """
+from types import MappingProxyType
+from sqlalchemy import event, insert
 from app.extensions import db
 
 
+# Permissions granted to each built-in role
+DEFAULT_PERMISSIONS = MappingProxyType({
+    'requester': frozenset({
+        'submit_cr',
+        'view_own_cr',
+        'edit_own_cr',
+        'attach_files'
+    }),
+    'approver': frozenset({
+        'submit_cr',
+        'view_own_cr',
+        'view_all_cr',
+        'approve_cr',
+        'reject_cr',
+        'request_changes'
+    }),
+    'implementer': frozenset({
+        'view_all_cr',
+        'implement_cr',
+        'update_implementation_status'
+    }),
+    'admin': frozenset({
+        'submit_cr',
+        'view_own_cr',
+        'view_all_cr',
+        'edit_own_cr',
+        'approve_cr',
+        'reject_cr',
+        'request_changes',
+        'implement_cr',
+        'rollback_cr',
+        'manage_users',
+        'manage_roles',
+        'manage_system',
+        'view_audit_logs',
+        'attach_files',
+        'update_implementation_status'
+    }),
+})
+ALL_DEFAULT_PERMISSION_NAMES = frozenset().union(*DEFAULT_PERMISSIONS.values())
+
+
+# Permission names per role id, shared by every request in this process.
+# Entries are dropped whenever a role or permission changes here; roles are
+# seeded data, so other processes pick up changes on restart.
+_ROLE_PERM_CACHE = {}
+
+
 # Association table for role-permission many-to-many relationship
 role_permissions = db.Table(
     'role_permissions',
@@ -26,12 +76,22 @@ class Role(db.Model):
     
     # Relationships
     permissions = db.relationship('Permission', secondary=role_permissions,
-                                 back_populates='roles', lazy='subquery')
-    users = db.relationship('User', back_populates='role', lazy='dynamic')
+                                 back_populates='roles', lazy='selectin')
+    users = db.relationship('User', back_populates='role')
     
     def __repr__(self):
         return f'<Role {self.name}>'
     
+    @property
+    def permission_names(self):
+        """Names of this role's permissions, cached per role id"""
+        names = _ROLE_PERM_CACHE.get(self.id)
+        if names is None:
+            names = frozenset(p.name for p in self.permissions)
+            if self.id is not None:
+                _ROLE_PERM_CACHE[self.id] = names
+        return names
+    
     def has_permission(self, permission_name):
         """
         Check if role has a specific permission
@@ -42,17 +102,19 @@ class Role(db.Model):
         Returns:
             bool: True if role has permission
         """
-        return any(p.name == permission_name for p in self.permissions)
+        return permission_name in self.permission_names
     
     def add_permission(self, permission):
         """Add permission to role"""
         if permission not in self.permissions:
             self.permissions.append(permission)
+            _ROLE_PERM_CACHE.pop(self.id, None)
     
     def remove_permission(self, permission):
         """Remove permission from role"""
         if permission in self.permissions:
             self.permissions.remove(permission)
+            _ROLE_PERM_CACHE.pop(self.id, None)
     
     @staticmethod
     def insert_default_roles():
@@ -60,70 +122,50 @@ class Role(db.Model):
         Insert default roles and permissions
         Should be called during database initialization
         """
-        from app.extensions import db
+        role_names = list(DEFAULT_PERMISSIONS)
+        all_permission_names = sorted(ALL_DEFAULT_PERMISSION_NAMES)
         
-        # Define default permissions
-        default_permissions = {
-            'requester': [
-                'submit_cr',
-                'view_own_cr',
-                'edit_own_cr',
-                'attach_files'
-            ],
-            'approver': [
-                'submit_cr',
-                'view_own_cr',
-                'view_all_cr',
-                'approve_cr',
-                'reject_cr',
-                'request_changes'
-            ],
-            'implementer': [
-                'view_all_cr',
-                'implement_cr',
-                'update_implementation_status'
-            ],
-            'admin': [
-                'submit_cr',
-                'view_own_cr',
-                'view_all_cr',
-                'edit_own_cr',
-                'approve_cr',
-                'reject_cr',
-                'request_changes',
-                'implement_cr',
-                'rollback_cr',
-                'manage_users',
-                'manage_roles',
-                'manage_system',
-                'view_audit_logs',
-                'attach_files',
-                'update_implementation_status'
-            ]
+        # Insert missing permissions and roles, one statement per table
+        existing_permissions = {
+            name for (name,) in db.session.query(Permission.name)
+            .filter(Permission.name.in_(all_permission_names))
         }
+        missing_permissions = [
+            {'name': name, 'description': name.replace('_', ' ').capitalize()}
+            for name in all_permission_names if name not in existing_permissions
+        ]
+        if missing_permissions:
+            db.session.execute(insert(Permission), missing_permissions)
         
-        for role_name, permission_names in default_permissions.items():
-            role = Role.query.filter_by(name=role_name).first()
-            
-            if not role:
-                role = Role(
-                    name=role_name,
-                    description=f'{role_name.capitalize()} role'
-                )
-                db.session.add(role)
-            
-            # Add permissions
-            for perm_name in permission_names:
-                permission = Permission.query.filter_by(name=perm_name).first()
-                
-                if not permission:
-                    permission = Permission(
-                        name=perm_name,
-                        description=f'{perm_name.replace("_", " ").capitalize()}'
-                    )
-                    db.session.add(permission)
-                
-                role.add_permission(permission)
+        existing_roles = {
+            name for (name,) in db.session.query(Role.name).filter(Role.name.in_(role_names))
+        }
+        missing_roles = [
+            {'name': name, 'description': f'{name.capitalize()} role'}
+            for name in role_names if name not in existing_roles
+        ]
+        if missing_roles:
+            db.session.execute(insert(Role), missing_roles)
+        
+        # Link roles to their permissions, skipping links that already exist
+        permission_ids = dict(
+            db.session.query(Permission.name, Permission.id)
+            .filter(Permission.name.in_(all_permission_names))
+        )
+        role_ids = dict(db.session.query(Role.name, Role.id).filter(Role.name.in_(role_names)))
+        existing_links = set(
+            db.session.query(role_permissions.c.role_id, role_permissions.c.permission_id)
+            .filter(role_permissions.c.role_id.in_(role_ids.values()))
+        )
+        missing_links = [
+            {'role_id': role_ids[role_name], 'permission_id': permission_ids[perm_name]}
+            for role_name, permission_names in DEFAULT_PERMISSIONS.items()
+            for perm_name in sorted(permission_names)
+            if (role_ids[role_name], permission_ids[perm_name]) not in existing_links
+        ]
+        if missing_links:
+            db.session.execute(role_permissions.insert(), missing_links)
+            _ROLE_PERM_CACHE.clear()
         
         db.session.commit()
 
@@ -138,7 +180,21 @@ class Permission(db.Model):
     
     # Relationships
     roles = db.relationship('Role', secondary=role_permissions,
-                           back_populates='permissions', lazy='dynamic')
+                           back_populates='permissions')
     
     def __repr__(self):
         return f'<Permission {self.name}>'
+
+
+@event.listens_for(Role, 'after_update')
+@event.listens_for(Role, 'after_delete')
+def _invalidate_role_permissions(mapper, connection, role):
+    """Forget a role's cached permission names once it is written"""
+    _ROLE_PERM_CACHE.pop(role.id, None)
+
+
+@event.listens_for(Permission, 'after_update')
+@event.listens_for(Permission, 'after_delete')
+def _invalidate_all_role_permissions(mapper, connection, permission):
+    """A renamed or deleted permission may belong to any role"""
+    _ROLE_PERM_CACHE.clear()
@@ -0,0 +1,33 @@
+"""
+Timestamp helpers shared by the models
+Lets the database supply created/updated timestamps in UTC
+"""
+from datetime import timezone
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+UTC = timezone.utc
+
+
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, 'sqlite')
+def _sqlite_utcnow(element, compiler, **kw):
+    # CURRENT_TIMESTAMP on SQLite only has second precision
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
@@ -2,11 +2,54 @@
 User Model for Change Management System
 Implements CMS-F-001, CMS-F-002, CMS-F-003
 """
+from collections import OrderedDict
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from functools import cached_property
+import threading
+import time
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from flask_login import UserMixin
+from sqlalchemy import and_, case, event, func, inspect, select, update
+from flask import current_app
+from sqlalchemy.orm import Session, joinedload, lazyload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 import pyotp
 from app.extensions import db, login_manager
+from app.models.timestamps import UTC, utcnow
+from app.models.role import Role
+from app.models.change_request import CRStatus
+from app.models.project import Project, ProjectMembership
+
+
+# Argon2id via argon2-cffi; legacy Werkzeug (pbkdf2/scrypt) hashes are still
+# accepted and upgraded on the next successful login.
+_PH = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+# Statuses an implementer may see within their projects
+IMPLEMENTER_ACCESSIBLE_STATUSES = frozenset({
+    CRStatus.APPROVED,
+    CRStatus.IN_PROGRESS,
+    CRStatus.IMPLEMENTED,
+    CRStatus.CLOSED,
+    CRStatus.ROLLED_BACK,
+})
+
+# Active project ids per user id, shared across requests. Entries are
+# dropped when memberships change in this process and expire after the TTL
+# so changes made by other workers are picked up. Guarded by the lock since
+# request threads and commit listeners update it concurrently.
+_USER_PROJECTS_CACHE = OrderedDict()
+_USER_PROJECTS_LOCK = threading.Lock()
+_USER_PROJECTS_CACHE_SIZE = 10000
+_USER_PROJECTS_TTL = 60
+
+# (expiry, [(email, username), ...]) of admin users for notification emails.
+# Cleared when users or roles are written in this process and expired after
+# the TTL so changes made by other workers are picked up.
+_ADMIN_RECIPIENTS_CACHE = [0.0, None]
+_ADMIN_RECIPIENTS_TTL = 60
 
 
 class User(UserMixin, db.Model):
@@ -20,14 +63,24 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Credentials are only read when verifying; defer them out of the per-request row
+    password_hash = db.deferred(db.Column(db.String(256), nullable=False), group='credentials')
     
     # Profile
     first_name = db.Column(db.String(64))
     last_name = db.Column(db.String(64))
     
+    # "First Last" when both are set, otherwise the username; computed in SQL
+    # so it is loaded with the row and usable in ORDER BY/WHERE
+    full_name = db.column_property(
+        case(
+            (and_(first_name != '', last_name != ''), first_name + ' ' + last_name),
+            else_=username
+        )
+    )
+    
     # MFA (CMS-F-002)
-    mfa_secret = db.Column(db.String(32))  # TOTP secret
+    mfa_secret = db.deferred(db.Column(db.String(32)), group='credentials')  # TOTP secret
     mfa_enabled = db.Column(db.Boolean, default=False)
     mfa_verified = db.Column(db.Boolean, default=False)  # Session-level verification
     
@@ -39,12 +92,13 @@ class User(UserMixin, db.Model):
     last_login_ip = db.Column(db.String(45))  # IPv6 support
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False)
-    role = db.relationship('Role', back_populates='users')
+    role_name = db.Column(db.String(64), index=True, nullable=False)  # Denormalized roles.name
+    role = db.relationship('Role', back_populates='users', lazy='joined', innerjoin=True)
     
     # Change requests created by user
     change_requests = db.relationship('ChangeRequest', 
@@ -52,7 +106,7 @@ class User(UserMixin, db.Model):
                                      foreign_keys='ChangeRequest.requester_id')
     
     # Audit logs
-    audit_logs = db.relationship('AuditLog', back_populates='user', lazy='dynamic')
+    audit_logs = db.relationship('AuditLog', back_populates='user')
     
     # Project memberships
     project_memberships = db.relationship('ProjectMembership', back_populates='user', cascade='all, delete-orphan')
@@ -63,12 +117,68 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
     
-    @property
-    def full_name(self):
-        """Get user's full name"""
-        if self.first_name and self.last_name:
-            return f'{self.first_name} {self.last_name}'
-        return self.username
+    @cached_property
+    def role_name_lower(self):
+        """Lower-cased role name, computed once per loaded user"""
+        return self.role_name.lower() if self.role_name else None
+    
+    @cached_property
+    def permission_names(self):
+        """Names of the permissions granted by the user's role, computed once per loaded user"""
+        return self.role.permission_names if self.role else frozenset()
+    
+    @cached_property
+    def _active_memberships(self):
+        """Active project memberships keyed by project id, computed once per loaded user"""
+        return {m.project_id: m for m in self.project_memberships if m.is_active}
+    
+    @cached_property
+    def active_project_ids(self):
+        """IDs of projects the user is an active member of, cached across requests for a short TTL"""
+        with _USER_PROJECTS_LOCK:
+            entry = _USER_PROJECTS_CACHE.get(self.id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        if 'project_memberships' in self.__dict__:
+            ids = frozenset(self._active_memberships)
+        else:
+            ids = frozenset(
+                project_id for (project_id,) in db.session.query(ProjectMembership.project_id)
+                .filter_by(user_id=self.id, is_active=True)
+            )
+        if self.id is not None:
+            with _USER_PROJECTS_LOCK:
+                _USER_PROJECTS_CACHE[self.id] = (time.monotonic() + _USER_PROJECTS_TTL, ids)
+                _USER_PROJECTS_CACHE.move_to_end(self.id)
+                if len(_USER_PROJECTS_CACHE) > _USER_PROJECTS_CACHE_SIZE:
+                    _USER_PROJECTS_CACHE.popitem(last=False)
+        return ids
+    
+    @classmethod
+    def admin_recipients(cls):
+        """
+        Email addresses and usernames of all admins, cached across requests for a short TTL
+        
+        Returns:
+            list: (email, username) tuples
+        """
+        expires, recipients = _ADMIN_RECIPIENTS_CACHE
+        if recipients is not None and expires > time.monotonic():
+            return recipients
+        
+        # Filter on the denormalized role_name column instead of joining roles
+        recipients = [
+            (email, username) for email, username
+            in db.session.query(cls.email, cls.username).filter(cls.role_name == 'admin')
+        ]
+        _ADMIN_RECIPIENTS_CACHE[:] = [time.monotonic() + _ADMIN_RECIPIENTS_TTL, recipients]
+        return recipients
+    
+    def audit_logs_query(self):
+        """Query of this user's audit logs, for filtering or paginating without loading them all"""
+        from app.models.audit import AuditLog
+        return AuditLog.query.filter_by(user_id=self.id)
     
     def set_password(self, password):
         """
@@ -77,7 +187,7 @@ class User(UserMixin, db.Model):
         Args:
             password: Plain text password
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _PH.hash(password)
     
     def check_password(self, password):
         """
@@ -89,7 +199,28 @@ class User(UserMixin, db.Model):
         Returns:
             bool: True if password matches
         """
-        return check_password_hash(self.password_hash, password)
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        
+        try:
+            _PH.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if _PH.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+    
+    @property
+    def _totp(self):
+        """TOTP object for the current secret, rebuilt only when the secret changes"""
+        cached = self.__dict__.get('_totp_cache')
+        if cached is None or cached[0] != self.mfa_secret:
+            cached = (self.mfa_secret, pyotp.TOTP(self.mfa_secret))
+            self.__dict__['_totp_cache'] = cached
+        return cached[1]
     
     def generate_mfa_secret(self):
         """
@@ -115,7 +246,7 @@ class User(UserMixin, db.Model):
         if not self.mfa_secret:
             self.generate_mfa_secret()
         
-        return pyotp.totp.TOTP(self.mfa_secret).provisioning_uri(
+        return self._totp.provisioning_uri(
             name=self.email,
             issuer_name=issuer_name
         )
@@ -133,8 +264,7 @@ class User(UserMixin, db.Model):
         if not self.mfa_secret:
             return False
         
-        totp = pyotp.TOTP(self.mfa_secret)
-        return totp.verify(token, valid_window=1)  # Allow 1 time step window
+        return self._totp.verify(token, valid_window=1)  # Allow 1 time step window
     
     def has_permission(self, permission):
         """
@@ -147,9 +277,7 @@ class User(UserMixin, db.Model):
         Returns:
             bool: True if user has permission
         """
-        if not self.role:
-            return False
-        return self.role.has_permission(permission)
+        return permission in self.permission_names
     
     def has_role(self, role_name):
         """
@@ -161,22 +289,42 @@ class User(UserMixin, db.Model):
         Returns:
             bool: True if user has role
         """
-        return self.role and self.role.name == role_name
+        return self.role_name == role_name
     
     def is_admin(self):
         """Check if user is an administrator"""
         return self.has_role('admin')
     
+    def _update_self(self, **values):
+        """
+        Write columns with a single UPDATE and mirror the stored values onto this instance
+        
+        Args:
+            **values: Column names mapped to values or SQL expressions
+        """
+        row = db.session.execute(
+            update(User)
+            .where(User.id == self.id)
+            .values(**values)
+            .returning(*(getattr(User, key) for key in values))
+            .execution_options(synchronize_session=False)
+        ).one()
+        for key, value in zip(values, row):
+            set_committed_value(self, key, value)
+    
     def increment_failed_login(self):
-        """Increment failed login attempts"""
-        self.failed_login_attempts += 1
-        if self.failed_login_attempts >= 5:
-            self.is_locked = True
+        """Atomically increment failed login attempts, locking the account at 5"""
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        self._update_self(
+            failed_login_attempts=attempts,
+            is_locked=case((attempts >= 5, True), else_=User.is_locked)
+        )
     
     def reset_failed_login(self):
         """Reset failed login attempts after successful login"""
-        self.failed_login_attempts = 0
-        self.is_locked = False
+        if not self.failed_login_attempts and not self.is_locked:
+            return
+        self._update_self(failed_login_attempts=0, is_locked=False)
     
     def update_last_login(self, ip_address):
         """
@@ -185,25 +333,27 @@ class User(UserMixin, db.Model):
         Args:
             ip_address: IP address of the login
         """
-        self.last_login = datetime.utcnow()
-        self.last_login_ip = ip_address
+        self._update_self(last_login=datetime.now(UTC), last_login_ip=ip_address)
     
     # Project-related methods
     def get_projects(self):
         """Get all active projects user is a member of"""
-        return [m.project for m in self.project_memberships if m.is_active and m.project.is_active]
+        return Project.query.join(
+            ProjectMembership, ProjectMembership.project_id == Project.id
+        ).filter(
+            ProjectMembership.user_id == self.id,
+            ProjectMembership.is_active == True,
+            Project.is_active == True
+        ).all()
     
     def get_project_role(self, project):
         """Get user's role in a specific project"""
-        membership = next((m for m in self.project_memberships 
-                          if m.project_id == project.id and m.is_active), None)
+        membership = self._active_memberships.get(project.id)
         return membership.role if membership else None
     
     def has_project_access(self, project):
         """Check if user has access to a project"""
-        if self.is_admin():
-            return True
-        return any(m.project_id == project.id and m.is_active for m in self.project_memberships)
+        return self.is_admin() or project.id in self.active_project_ids
     
     def can_access_cr(self, change_request):
         """
@@ -213,14 +363,14 @@ class User(UserMixin, db.Model):
         - Approvers: All CRs in assigned projects
         - Implementers: Only approved CRs in assigned projects
         """
-        user_role_name = self.role.name.lower() if self.role else None
+        user_role_name = self.role_name_lower
         
         if user_role_name == 'admin':
             # Admins can only access CRs of projects they created
             return change_request.project.created_by_id == self.id
         
-        # Check if user has access to the project
-        if not self.has_project_access(change_request.project):
+        # Check if user is an active member of the CR's project
+        if change_request.project_id not in self.active_project_ids:
             return False
         
         if user_role_name == 'requester':
@@ -229,14 +379,7 @@ class User(UserMixin, db.Model):
         
         elif user_role_name == 'implementer':
             # Implementers can only access approved CRs
-            from app.models.change_request import CRStatus
-            return change_request.status in [
-                CRStatus.APPROVED,
-                CRStatus.IN_PROGRESS,
-                CRStatus.IMPLEMENTED,
-                CRStatus.CLOSED,
-                CRStatus.ROLLED_BACK
-            ]
+            return change_request.status in IMPLEMENTER_ACCESSIBLE_STATUSES
         
         elif user_role_name == 'approver':
             # Approvers can access all CRs in their projects
@@ -245,6 +388,89 @@ class User(UserMixin, db.Model):
         return False
 
 
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def _sync_role_name(mapper, connection, target):
+    """Keep the denormalized role_name in step with role_id"""
+    role = target.__dict__.get('role')
+    if role is not None and role.id == target.role_id:
+        target.role_name = role.name
+    elif target.role_name is None or inspect(target).attrs.role_id.history.has_changes():
+        target.role_name = connection.scalar(select(Role.name).where(Role.id == target.role_id))
+
+
+@event.listens_for(Role, 'after_update')
+def _propagate_role_rename(mapper, connection, target):
+    """Rewrite role_name on users when a role is renamed"""
+    if inspect(target).attrs.name.history.has_changes():
+        connection.execute(
+            update(User.__table__)
+            .where(User.__table__.c.role_id == target.id)
+            .values(role_name=target.name)
+        )
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+@event.listens_for(Role, 'after_update')
+@event.listens_for(Role, 'after_delete')
+def _invalidate_admin_recipients(mapper, connection, target):
+    """Drop the cached admin list once a user or role is written"""
+    _ADMIN_RECIPIENTS_CACHE[1] = None
+    session = Session.object_session(target)
+    if session is not None:
+        session.info['admin_recipients_stale'] = True
+
+
+@event.listens_for(User, 'after_update')
+def _invalidate_admin_recipients_on_user_update(mapper, connection, target):
+    """Only role, email and username changes affect the cached admin list"""
+    attrs = inspect(target).attrs
+    if any(attrs[key].history.has_changes() for key in ('role_id', 'email', 'username')):
+        _invalidate_admin_recipients(mapper, connection, target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_admin_recipients_on_commit(session):
+    """Drop the list again once the change is visible to other sessions"""
+    if session.info.pop('admin_recipients_stale', False):
+        _ADMIN_RECIPIENTS_CACHE[1] = None
+
+
+@event.listens_for(ProjectMembership, 'after_insert')
+@event.listens_for(ProjectMembership, 'after_update')
+@event.listens_for(ProjectMembership, 'after_delete')
+def _invalidate_user_projects(mapper, connection, target):
+    """Drop the cached project ids of a user whose membership changed"""
+    with _USER_PROJECTS_LOCK:
+        _USER_PROJECTS_CACHE.pop(target.user_id, None)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('membership_user_ids', set()).add(target.user_id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_on_bulk_membership_write(orm_execute_state):
+    """Bulk UPDATE/DELETE on memberships bypasses mapper events; drop everything"""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) \
+            and orm_execute_state.bind_mapper is ProjectMembership.__mapper__:
+        with _USER_PROJECTS_LOCK:
+            _USER_PROJECTS_CACHE.clear()
+        orm_execute_state.session.info['membership_bulk_write'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_user_projects_on_commit(session):
+    """Drop entries again once membership changes are visible to other sessions"""
+    bulk_write = session.info.pop('membership_bulk_write', False)
+    user_ids = session.info.pop('membership_user_ids', ())
+    with _USER_PROJECTS_LOCK:
+        if bulk_write:
+            _USER_PROJECTS_CACHE.clear()
+        for user_id in user_ids:
+            _USER_PROJECTS_CACHE.pop(user_id, None)
+
+
 @login_manager.user_loader
 def load_user(user_id):
     """
@@ -256,4 +482,10 @@ def load_user(user_id):
     Returns:
         User object or None
     """
-    return User.query.get(int(user_id))
\ No newline at end of file
+    # Permission names come from the per-role cache and project ids from
+    # _USER_PROJECTS_CACHE, so neither collection is loaded up front
+    options = [joinedload(User.role).lazyload(Role.permissions)]
+    if current_app.config.get('SQLALCHEMY_RAISELOAD'):
+        # Any other relationship touched on current_user is an accidental N+1
+        options += [lazyload(User.project_memberships), raiseload('*')]
+    return db.session.get(User, int(user_id), options=options)
\ No newline at end of file
@@ -3,8 +3,47 @@ User Invitation Model
 Tracks invitation tokens for new users
 """
 from app.extensions import db
+from app.models.timestamps import utcnow
 from datetime import datetime, timezone, timedelta
+from collections import OrderedDict
+from sqlalchemy.orm import load_only, reconstructor
+import hashlib
 import secrets
+import threading
+import time
+
+
+# Recently seen unknown/used tokens, keyed by truncated sha256 so raw tokens
+# are never kept in memory. Bounded LRU with a short TTL, guarded by the lock
+# since request threads look up and evict entries concurrently.
+_INVALID_TOKEN_CACHE = OrderedDict()
+_INVALID_TOKEN_LOCK = threading.Lock()
+_INVALID_TOKEN_CACHE_SIZE = 1024
+_INVALID_TOKEN_TTL = 300
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+
+def _is_known_invalid(digest):
+    with _INVALID_TOKEN_LOCK:
+        expires = _INVALID_TOKEN_CACHE.get(digest)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            _INVALID_TOKEN_CACHE.pop(digest, None)
+            return False
+        _INVALID_TOKEN_CACHE.move_to_end(digest)
+        return True
+
+
+def _remember_invalid(digest):
+    with _INVALID_TOKEN_LOCK:
+        _INVALID_TOKEN_CACHE[digest] = time.monotonic() + _INVALID_TOKEN_TTL
+        _INVALID_TOKEN_CACHE.move_to_end(digest)
+        if len(_INVALID_TOKEN_CACHE) > _INVALID_TOKEN_CACHE_SIZE:
+            _INVALID_TOKEN_CACHE.popitem(last=False)
 
 
 class UserInvitation(db.Model):
@@ -13,12 +52,12 @@ class UserInvitation(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
-    token = db.Column(db.String(100), unique=True, nullable=False)
+    token = db.Column(db.String(43), unique=True, nullable=False)  # secrets.token_urlsafe(32)
     mfa_secret = db.Column(db.String(32), nullable=True)  # Store MFA secret temporarily
     is_accepted = db.Column(db.Boolean, default=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
     accepted_at = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, server_default=utcnow())
     
     # Relationships
     user = db.relationship('User', back_populates='invitation', foreign_keys=[user_id])
@@ -28,14 +67,42 @@ class UserInvitation(db.Model):
         self.token = secrets.token_urlsafe(32)
         self.mfa_secret = mfa_secret
         self.expires_at = datetime.now(timezone.utc) + timedelta(hours=expiry_hours)
+        self._expires_utc = self.expires_at
     
-    def is_valid(self):
-        """Check if invitation is still valid"""
-        # Make expires_at timezone-aware if it's naive
+    @reconstructor
+    def _init_on_load(self):
+        """Resolve the UTC expiry once when the row is loaded"""
+        # SQLite hands back naive datetimes; they are stored as UTC
         expires = self.expires_at
-        if expires.tzinfo is None:
+        if expires is not None and expires.tzinfo is None:
             expires = expires.replace(tzinfo=timezone.utc)
-        return not self.is_accepted and datetime.now(timezone.utc) < expires
+        self._expires_utc = expires
+    
+    @classmethod
+    def find_valid(cls, token):
+        """
+        Look up a pending invitation by token
+        
+        Args:
+            token: Raw invitation token from the URL
+            
+        Returns:
+            UserInvitation or None if the token is unknown or already accepted
+        """
+        digest = _token_digest(token)
+        if _is_known_invalid(digest):
+            return None
+        
+        invitation = db.session.query(cls).options(
+            load_only(cls.id, cls.user_id, cls.expires_at, cls.is_accepted)
+        ).filter(cls.token == token, cls.is_accepted.is_(False)).first()
+        if invitation is None:
+            _remember_invalid(digest)
+        return invitation
+    
+    def is_valid(self):
+        """Check if invitation is still valid"""
+        return not self.is_accepted and datetime.now(timezone.utc) < self._expires_utc
     
     def accept(self):
         """Mark invitation as accepted"""
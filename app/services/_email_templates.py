@@ -0,0 +1,717 @@
+"""
+Email HTML templates
+Compiled once at import time and rendered per email by EmailService
+"""
+from jinja2 import Environment
+from markupsafe import Markup
+
+ENV = Environment(autoescape=True, auto_reload=False)
+
+
+def format_minutes(value):
+    """Format a datetime as 'YYYY-MM-DD HH:MM', like strftime but cheaper; the slice drops any UTC offset"""
+    return value.isoformat(' ', 'minutes')[:16]
+
+
+def format_seconds(value):
+    """Format a datetime as 'YYYY-MM-DD HH:MM:SS'"""
+    return value.isoformat(' ', 'seconds')[:19]
+
+
+ENV.filters['minutes'] = format_minutes
+
+# Stand-in for the recipient's name in batch notifications: the body is
+# rendered once and the name swapped in per recipient. It is markup, so an
+# escaped CR field can never contain it.
+RECIPIENT_SLOT = Markup('<recipient-name/>')
+
+
+_QR_BLOCK_SRC = """
+<table width="100%" cellpadding="0" cellspacing="0" style="margin: 25px 0;">
+    <tr>
+        <td style="background: #fff3cd; border: 1px solid #ffc107; border-radius: 8px; padding: 25px;">
+            <h3 style="color: #856404; margin: 0 0 10px 0; font-size: 18px;">🔐 Multi-Factor Authentication Setup</h3>
+            <p style="color: #856404; margin: 0 0 20px 0; font-size: 14px;">As an administrator, your account requires MFA for enhanced security.</p>
+
+            <table width="100%" cellpadding="20" cellspacing="0" style="background: white; border-radius: 5px;">
+                <tr>
+                    <td align="center">
+                        <p style="margin: 0 0 10px 0; color: #333; font-weight: bold;">Step 1: Install an authenticator app</p>
+                        <p style="margin: 0 0 20px 0; font-size: 13px; color: #666;">Google Authenticator, Authy, or Microsoft Authenticator</p>
+
+                        <p style="margin: 0 0 15px 0; color: #333; font-weight: bold;">Step 2: Scan this QR code</p>
+                        <table cellpadding="0" cellspacing="0" style="margin: 0 auto;">
+                            <tr>
+                                <td style="padding: 15px; background: white; border: 3px solid #667eea; border-radius: 10px;">
+                                    <img src="cid:qrcode.png" alt="MFA QR Code" width="200" height="200" style="display: block; margin: 0; padding: 0;"/>
+                                </td>
+                            </tr>
+                        </table>
+
+                        <p style="margin: 20px 0 10px 0; color: #333; font-weight: bold;">Or manually enter this code:</p>
+                        <p style="margin: 0; font-family: 'Courier New', monospace; font-size: 16px; color: #667eea; font-weight: bold; letter-spacing: 2px;">{{ mfa_secret }}</p>
+                    </td>
+                </tr>
+            </table>
+        </td>
+    </tr>
+</table>
+"""
+
+_INVITATION_SRC = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f4f4f4;">
+    <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f4f4f4; padding: 20px 0;">
+        <tr>
+            <td align="center">
+                <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+                    <!-- Header -->
+                    <tr>
+                        <td style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 40px 30px; text-align: center;">
+                            <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Welcome to CMS</h1>
+                            <p style="color: #ffffff; margin: 10px 0 0 0; font-size: 14px; opacity: 0.9;">Change Management System</p>
+                        </td>
+                    </tr>
+
+                    <!-- Content -->
+                    <tr>
+                        <td style="padding: 40px 30px;">
+                            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0;">Hello <strong>{{ display_name }}</strong>,</p>
+
+                            <p style="font-size: 15px; color: #555; line-height: 1.6; margin: 0 0 25px 0;">
+                                You have been invited to join the Change Management System. Click the button below to accept your invitation and set up your account.
+                            </p>
+
+                            {% if is_admin %}<p style="color: #856404; background: #fff3cd; padding: 10px; border-radius: 5px; border-left: 4px solid #ffc107;"><strong>Administrator Access:</strong> You have full system access including user management, project configuration, and audit logs.</p>{% endif %}
+
+                            <!-- Account Details Box -->
+                            <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f8f9fa; border-left: 4px solid #667eea; margin: 25px 0;">
+                                <tr>
+                                    <td style="padding: 20px;">
+                                        <p style="margin: 0 0 15px 0; font-size: 14px; color: #333; font-weight: 600;">Your Account Details:</p>
+                                        <p style="margin: 5px 0; font-size: 14px; color: #555;">📧 <strong>Email:</strong> {{ user.email }}</p>
+                                        <p style="margin: 5px 0; font-size: 14px; color: #555;">👤 <strong>Username:</strong> {{ user.username }}</p>
+                                        <p style="margin: 5px 0; font-size: 14px; color: #555;">🎭 <strong>Role:</strong> {{ role_title }}</p>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            {{ qr_code_html }}
+
+                            <!-- CTA Button -->
+                            <table width="100%" cellpadding="0" cellspacing="0" style="margin: 35px 0;">
+                                <tr>
+                                    <td align="center">
+                                        <a href="{{ accept_url }}"
+                                           target="_blank"
+                                           style="display: inline-block; padding: 16px 40px; background-color: #667eea; color: #ffffff; text-decoration: none; border-radius: 6px; font-weight: 600; font-size: 16px; box-shadow: 0 2px 4px rgba(102, 126, 234, 0.4);">
+                                            Accept Invitation & Activate Account
+                                        </a>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <p style="text-align: center; font-size: 12px; color: #666; margin: 10px 0 0 0;">
+                                Or copy and paste this link in your browser:<br>
+                                <a href="{{ accept_url }}" style="color: #667eea; word-break: break-all;">{{ accept_url }}</a>
+                            </p>
+
+                            <p style="font-size: 13px; color: #999; margin: 25px 0 0 0; padding-top: 20px; border-top: 1px solid #eee;">
+                                ⏰ <strong>Note:</strong> This invitation expires in 48 hours. If you didn't expect this invitation, please ignore this email.
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- Footer -->
+                    <tr>
+                        <td style="background-color: #f8f9fa; padding: 20px 30px; text-align: center; border-top: 1px solid #eee;">
+                            <p style="margin: 0; font-size: 12px; color: #999;">
+                                © 2025 Change Management System | TheChangeMakers
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>
+"""
+
+_CR_SUBMIT_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #667eea;">New Change Request Submitted</h2>
+    <p>Hello {{ recipient_name }},</p>
+    <p>A new change request has been submitted and requires your approval.</p>
+
+    <div style="background: #f9f9f9; padding: 20px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Requester:</strong> {{ cr.requester.email }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Priority:</strong> {{ cr.priority.value }}</p>
+    </div>
+
+    <p>Please review and approve this change request at your earliest convenience.</p>
+    <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+       style="display: inline-block; padding: 12px 30px; background: #667eea; color: white; text-decoration: none; border-radius: 5px;">
+        View Change Request
+    </a>
+</body>
+</html>
+"""
+
+_CR_APPROVE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #28a745;">Change Request Approved</h2>
+    <p>Hello {{ recipient_name }},</p>
+    <p>A change request has been approved and is ready for implementation.</p>
+
+    <div style="background: #f9f9f9; padding: 20px; border-left: 4px solid #28a745; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Approved By:</strong> {{ cr.approver.email if cr.approver else 'N/A' }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+    </div>
+
+    <p>Please begin implementation according to the approved plan.</p>
+    <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+       style="display: inline-block; padding: 12px 30px; background: #28a745; color: white; text-decoration: none; border-radius: 5px;">
+        View Change Request
+    </a>
+</body>
+</html>
+"""
+
+_CR_REJECT_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #dc3545;">Change Request Rejected</h2>
+    <p>Hello {{ cr.requester.first_name or cr.requester.email }},</p>
+    <p>Your change request has been reviewed and rejected.</p>
+
+    <div style="background: #f9f9f9; padding: 20px; border-left: 4px solid #dc3545; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Rejection Reason:</strong> {{ rejection_reason }}</p>
+    </div>
+
+    <p>Please review the feedback and resubmit if necessary.</p>
+</body>
+</html>
+"""
+
+_SLA_BREACH_WARNING_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #ff6b6b;">⚠️ SLA Deadline Warning</h2>
+    <p>This is an automated reminder that a change request is approaching its SLA deadline.</p>
+
+    <div style="background: #fff3cd; padding: 20px; border-left: 4px solid #ff6b6b; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Time Remaining:</strong> {{ hours_remaining }} hours</p>
+        <p><strong>Current Status:</strong> {{ cr.status.value }}</p>
+    </div>
+
+    <p>Please take immediate action to prevent SLA breach.</p>
+</body>
+</html>
+"""
+
+_CR_CLOSE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #667eea;">Change Request Closed</h2>
+    <p>A change request has been completed and closed.</p>
+
+    <div style="background: #f9f9f9; padding: 20px; border-left: 4px solid #667eea; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Final Status:</strong> {{ cr.status.value }}</p>
+        <p><strong>Closure Comments:</strong> {{ cr.closure_comments or 'N/A' }}</p>
+    </div>
+
+    <p>Thank you for your participation in this change request process.</p>
+</body>
+</html>
+"""
+
+_CR_IMPL_START_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #28a745;">🚀 Change Request Ready for Implementation</h2>
+    <p>Dear {{ cr.implementer.username }},</p>
+    <p>A change request has been <strong>approved</strong> and is ready for implementation.</p>
+
+    <div style="background: #d4edda; padding: 20px; border-left: 4px solid #28a745; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Priority:</strong> <span style="color: #dc3545;">{{ cr.priority.label }}</span></p>
+        <p><strong>Approved By:</strong> {{ cr.approver.username if cr.approver else 'N/A' }}</p>
+        <p><strong>Approved Date:</strong> {{ cr.approved_date|minutes if cr.approved_date else 'N/A' }}</p>
+    </div>
+
+    <div style="background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <p><strong>📋 Description:</strong></p>
+        <p>{{ cr.description }}</p>
+    </div>
+
+    {% if cr.implementation_notes %}
+    <div style="background: #cce5ff; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
+        <p><strong>📝 Implementation Notes:</strong></p>
+        <p>{{ cr.implementation_notes }}</p>
+    </div>
+    {% endif %}
+
+    <p><strong>⚠️ Please ensure:</strong></p>
+    <ul>
+        <li>Review all implementation notes and requirements</li>
+        <li>Follow the rollback plan if issues occur</li>
+        <li>Update the CR status after implementation</li>
+        <li>Document any code changes made</li>
+    </ul>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #28a745; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View Change Request
+        </a>
+    </div>
+
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_CR_IMPL_COMPLETE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #17a2b8;">✅ Change Request Implementation Complete</h2>
+    <p>Dear {{ cr.approver.username }},</p>
+    <p>The implementation of a change request has been completed and is awaiting your review for closure.</p>
+
+    <div style="background: #d1ecf1; padding: 20px; border-left: 4px solid #17a2b8; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Implemented By:</strong> {{ cr.implementer.username if cr.implementer else 'N/A' }}</p>
+        <p><strong>Implementation Date:</strong> {{ cr.implementation_date|minutes if cr.implementation_date else 'N/A' }}</p>
+    </div>
+
+    {% if changed_code %}
+    <div style="background: #f8f9fa; padding: 15px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <p><strong>💻 Code Changes:</strong></p>
+        <pre style="background: #e9ecef; padding: 10px; border-radius: 5px; overflow-x: auto; font-family: 'Courier New', monospace; font-size: 0.9em;">{{ changed_code }}</pre>
+    </div>
+    {% endif %}
+    {% if cr.implementation_notes %}
+    <div style="background: #e2e3e5; padding: 15px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <p><strong>📝 Implementation Notes:</strong></p>
+        <p>{{ cr.implementation_notes }}</p>
+    </div>
+    {% endif %}
+
+    <p><strong>📋 Next Steps:</strong></p>
+    <ul>
+        <li>Review the implementation details</li>
+        <li>Verify all changes are working correctly</li>
+        <li>Close the CR if satisfactory, or request rollback if issues found</li>
+    </ul>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #17a2b8; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            Review & Close CR
+        </a>
+    </div>
+
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_CR_ROLLBACK_REQUEST_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #dc3545;">⏪ Rollback Requested for Change Request</h2>
+    <p>Dear {{ cr.implementer.username }},</p>
+    <p><strong style="color: #dc3545;">URGENT:</strong> A rollback has been requested for a change request you implemented.</p>
+
+    <div style="background: #f8d7da; padding: 20px; border-left: 4px solid #dc3545; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Requested By:</strong> {{ cr.approver.username if cr.approver else 'N/A' }}</p>
+    </div>
+
+    <div style="background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <p><strong>🚨 Rollback Reason:</strong></p>
+        <p>{{ rollback_reason }}</p>
+    </div>
+
+    {% if cr.rollback_plan %}
+    <div style="background: #d1ecf1; padding: 15px; border-left: 4px solid #17a2b8; margin: 20px 0;">
+        <p><strong>📋 Rollback Plan:</strong></p>
+        <p>{{ cr.rollback_plan }}</p>
+    </div>
+    {% endif %}
+
+    <p><strong>⚠️ Action Required:</strong></p>
+    <ul>
+        <li>Review the rollback reason immediately</li>
+        <li>Follow the rollback plan to revert changes</li>
+        <li>Update the CR status after rollback completion</li>
+        <li>Document any issues encountered during rollback</li>
+    </ul>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #dc3545; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View CR & Execute Rollback
+        </a>
+    </div>
+
+    <p style="color: #dc3545; font-weight: bold;">⏰ This is a HIGH PRIORITY request. Please address immediately.</p>
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_CR_ROLLBACK_COMPLETE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #6c757d;">🔄 Rollback Complete</h2>
+    <p>Dear {{ cr.approver.username }},</p>
+    <p>The rollback for a change request has been completed successfully.</p>
+
+    <div style="background: #e2e3e5; padding: 20px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Rolled Back By:</strong> {{ cr.implementer.username if cr.implementer else 'N/A' }}</p>
+        <p><strong>Rollback Date:</strong> {{ cr.rolled_back_at|minutes if cr.rolled_back_at else 'N/A' }}</p>
+    </div>
+
+    {% if cr.rollback_reason %}
+    <div style="background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <p><strong>📝 Rollback Reason:</strong></p>
+        <p>{{ cr.rollback_reason }}</p>
+    </div>
+    {% endif %}
+
+    <p>All changes have been reverted to the previous state. The change request status has been updated.</p>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #6c757d; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View Change Request
+        </a>
+    </div>
+
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_IMPLEMENTATION_COMPLETE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #28a745;">✅ CR Implementation Complete - Closure Required</h2>
+    <p>Dear {{ cr.approver.username }},</p>
+    <p>The implementation of a change request has been <strong>completed</strong> and is now awaiting your review and closure.</p>
+
+    <div style="background: #d4edda; padding: 20px; border-left: 4px solid #28a745; margin: 20px 0;">
+        <p><strong>CR Number:</strong> {{ cr.cr_number }}</p>
+        <p><strong>Title:</strong> {{ cr.title }}</p>
+        <p><strong>Project:</strong> {{ cr.project.name }}</p>
+        <p><strong>Implemented By:</strong> {{ cr.implementer.username if cr.implementer else 'N/A' }}</p>
+        <p><strong>Status:</strong> <span style="color: #28a745; font-weight: bold;">IMPLEMENTED</span></p>
+    </div>
+
+    {% if cr.implementation_deadline %}
+    <div style="background: #d4edda; padding: 15px; border-left: 4px solid #28a745; margin: 20px 0;">
+        <p><strong>⏰ Deadline Status:</strong></p>
+        <p>Implementation Deadline: {{ cr.implementation_deadline|minutes }}</p>
+        <p>Status: {{ '✅ Completed on time' if completed_on_time else '⚠️ Completed after deadline' }}</p>
+    </div>
+    {% endif %}
+    {% if cr.rollback_plan or cr.rollback_plan_file %}
+    <div style="background: #f8f9fa; padding: 15px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <p><strong>🔄 Rollback Plan Available:</strong></p>
+        <p>A rollback plan is available if any issues are found during review.</p>
+    </div>
+    {% endif %}
+
+    <p><strong>📋 Next Steps - Action Required:</strong></p>
+    <ul>
+        <li>Review the implementation details and verify all changes</li>
+        <li>Test the implemented changes in the appropriate environment</li>
+        <li>Close the CR if everything is satisfactory</li>
+        <li>Request rollback if any issues are found</li>
+    </ul>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}/close"
+           style="background: #28a745; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block; margin-right: 10px;">
+            Close Change Request
+        </a>
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #17a2b8; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View Details
+        </a>
+    </div>
+
+    <p style="color: #856404; background: #fff3cd; padding: 10px; border-radius: 5px; border-left: 4px solid #ffc107;">
+        <strong>⚠️ Note:</strong> Please complete the closure process promptly. The complete timeline will be sent to the admin upon closure for record-keeping (CMSF-019).
+    </p>
+
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_CLOSURE_TIMELINE_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #667eea;">🏁 Change Request Closed - Complete Timeline</h2>
+    <p>Dear {{ username }},</p>
+    <p>A change request has been successfully closed. Below is the complete timeline for your records (CMSF-019).</p>
+
+    <div style="background: #e7f3ff; padding: 20px; border-left: 4px solid #667eea; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #667eea;">CR Summary</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">CR Number:</td><td style="padding: 5px;">{{ cr.cr_number }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Title:</td><td style="padding: 5px;">{{ cr.title }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Project:</td><td style="padding: 5px;">{{ cr.project.name }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Priority:</td><td style="padding: 5px;"><span style="color: #dc3545; font-weight: bold;">{{ cr.priority.label }}</span></td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Risk Level:</td><td style="padding: 5px;"><span style="color: #ffc107; font-weight: bold;">{{ cr.risk_level.label }}</span></td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Final Status:</td><td style="padding: 5px;"><span style="color: #28a745; font-weight: bold;">{{ cr.status.label }}</span></td></tr>
+        </table>
+    </div>
+
+    <div style="background: #f8f9fa; padding: 20px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #495057;">⏱️ Timeline Metrics</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">Total Time:</td><td style="padding: 5px;">{{ time_taken }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">SLA Deadline:</td><td style="padding: 5px;">{{ cr.implementation_deadline|minutes if cr.implementation_deadline else 'N/A' }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Deadline Status:</td><td style="padding: 5px;">{{ deadline_status }}</td></tr>
+        </table>
+    </div>
+
+    <div style="background: #fff; padding: 20px; border: 1px solid #dee2e6; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #495057;">📋 Complete Timeline</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            {% for icon, label, date, user in timeline_rows %}
+            <tr style="border-bottom: 1px solid #dee2e6;">
+                <td style="padding: 10px; white-space: nowrap;">{{ icon }} {{ label }}</td>
+                <td style="padding: 10px;">{{ date }}</td>
+                <td style="padding: 10px;">{{ user }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+    </div>
+
+    <div style="background: #d4edda; padding: 20px; border-left: 4px solid #28a745; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #155724;">👥 Stakeholders</h3>
+        {% set requester, approver, implementer, closed_by = cr.requester, cr.approver, cr.implementer, cr.closed_by %}
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">Requester:</td><td style="padding: 5px;">{{ requester.username }} ({{ requester.email }})</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Approver:</td><td style="padding: 5px;">{% if approver %}{{ approver.username }} ({{ approver.email }}){% else %}N/A (N/A){% endif %}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Implementer:</td><td style="padding: 5px;">{% if implementer %}{{ implementer.username }} ({{ implementer.email }}){% else %}N/A (N/A){% endif %}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Closed By:</td><td style="padding: 5px;">{% if closed_by %}{{ closed_by.username }} ({{ closed_by.email }}){% else %}N/A (N/A){% endif %}</td></tr>
+        </table>
+    </div>
+
+    {% if cr.closure_notes %}
+    <div style="background: #fff3cd; padding: 20px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #856404;">📝 Closure Notes</h3>
+        <p>{{ cr.closure_notes }}</p>
+    </div>
+    {% endif %}
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #667eea; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View Full Details
+        </a>
+    </div>
+
+    <p style="color: #666; font-size: 0.9em;">
+        This timeline has been automatically archived for record-keeping purposes as per CMSF-019.<br>
+        Generated: {{ generated_at }}
+    </p>
+</body>
+</html>
+"""
+
+_SLA_WARNING_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #ff6b6b;">⚠️ SLA DEADLINE WARNING - 24 HOURS REMAINING</h2>
+    <p>Dear {{ username }},</p>
+    <p><strong style="color: #dc3545;">URGENT:</strong> A change request is approaching its SLA deadline in approximately 24 hours.</p>
+
+    <div style="background: #fff3cd; padding: 20px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #856404;">⏰ Deadline Information</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">CR Number:</td><td style="padding: 5px;">{{ cr.cr_number }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Title:</td><td style="padding: 5px;">{{ cr.title }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Project:</td><td style="padding: 5px;">{{ cr.project.name }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Current Status:</td><td style="padding: 5px;"><span style="color: #007bff; font-weight: bold;">{{ cr.status.label }}</span></td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Deadline:</td><td style="padding: 5px; color: #dc3545; font-weight: bold;">{{ deadline }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Time Remaining:</td><td style="padding: 5px; color: #dc3545; font-weight: bold;">~{{ hours_remaining }} hours</td></tr>
+        </table>
+    </div>
+
+    <div style="background: #f8d7da; padding: 20px; border-left: 4px solid #dc3545; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #721c24;">🚨 Action Required</h3>
+        <ul style="margin: 10px 0;">
+            <li><strong>Implementer:</strong> Complete implementation immediately to avoid SLA breach</li>
+            <li><strong>Approver:</strong> Expedite review and closure process if already implemented</li>
+            <li><strong>Requester:</strong> Follow up with stakeholders if needed</li>
+        </ul>
+    </div>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #dc3545; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View Change Request Immediately
+        </a>
+    </div>
+
+    <p style="color: #721c24; background: #f8d7da; padding: 10px; border-radius: 5px; font-weight: bold;">
+        ⏰ This is an automated SLA warning as per CMSF-016. Please take immediate action to prevent deadline breach.
+    </p>
+
+    <p style="color: #666; font-size: 0.9em;">This is an automated notification from the Change Management System.</p>
+</body>
+</html>
+"""
+
+_SLA_BREACH_SRC = """
+<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <h2 style="color: #dc3545;">🚨 SLA BREACH ALERT - DEADLINE EXCEEDED</h2>
+    <p>Dear {{ username }},</p>
+    <p><strong style="color: #dc3545; font-size: 1.2em;">CRITICAL:</strong> A change request has breached its SLA deadline (CMSF-015).</p>
+
+    <div style="background: #f8d7da; padding: 20px; border-left: 4px solid #dc3545; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #721c24;">⏰ Breach Details</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">CR Number:</td><td style="padding: 5px;">{{ cr.cr_number }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Title:</td><td style="padding: 5px;">{{ cr.title }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Project:</td><td style="padding: 5px;">{{ cr.project.name }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Priority:</td><td style="padding: 5px;"><span style="color: #dc3545; font-weight: bold;">{{ cr.priority.label }}</span></td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Current Status:</td><td style="padding: 5px;"><span style="color: #ffc107; font-weight: bold;">{{ cr.status.label }}</span></td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Deadline Was:</td><td style="padding: 5px; color: #dc3545;">{{ cr.implementation_deadline|minutes }}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Time Overdue:</td><td style="padding: 5px; color: #dc3545; font-weight: bold;">~{{ hours_overdue }} hours</td></tr>
+        </table>
+    </div>
+
+    <div style="background: #fff3cd; padding: 20px; border-left: 4px solid #ffc107; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #856404;">👥 Responsible Parties</h3>
+        {% set requester, approver, implementer = cr.requester, cr.approver, cr.implementer %}
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td style="padding: 5px; font-weight: bold; width: 40%;">Requester:</td><td style="padding: 5px;">{{ requester.username }} ({{ requester.email }})</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Approver:</td><td style="padding: 5px;">{% if approver %}{{ approver.username }} ({{ approver.email }}){% else %}Not assigned (N/A){% endif %}</td></tr>
+            <tr><td style="padding: 5px; font-weight: bold;">Implementer:</td><td style="padding: 5px;">{% if implementer %}{{ implementer.username }} ({{ implementer.email }}){% else %}Not assigned (N/A){% endif %}</td></tr>
+        </table>
+    </div>
+
+    {% if cr.rollback_plan or cr.rollback_plan_file %}
+    <div style="background: #d1ecf1; padding: 20px; border-left: 4px solid #17a2b8; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #0c5460;">🔄 Rollback Plan Available</h3>
+        {% if cr.rollback_plan %}<p><strong>Text Plan:</strong></p><pre style="background: #f8f9fa; padding: 10px; border-radius: 5px; overflow-x: auto;">{{ cr.rollback_plan }}</pre>{% endif %}
+        {% if cr.rollback_plan_file %}<p><strong>File Plan:</strong> <a href="{{ base_url }}/static/uploads/{{ cr.rollback_plan_file }}" style="color: #17a2b8;">Download Rollback Plan</a></p>{% endif %}
+    </div>
+    {% endif %}
+
+    <div style="background: #e2e3e5; padding: 20px; border-left: 4px solid #6c757d; margin: 20px 0;">
+        <h3 style="margin-top: 0; color: #383d41;">📋 Recommended Actions</h3>
+        <ol style="margin: 10px 0; padding-left: 20px;">
+            <li>Contact implementer immediately to determine status and completion ETA</li>
+            <li>Assess impact of delay on business operations</li>
+            <li>Consider executing rollback plan if critical issues arise</li>
+            <li>Document reasons for delay for future reference</li>
+            <li>Escalate to stakeholders if necessary</li>
+        </ol>
+    </div>
+
+    <div style="margin: 30px 0;">
+        <a href="{{ base_url }}/change-requests/{{ cr.id }}"
+           style="background: #dc3545; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">
+            View CR & Take Action
+        </a>
+    </div>
+
+    <p style="color: #721c24; background: #f8d7da; padding: 10px; border-radius: 5px; font-weight: bold;">
+        🚨 This is a critical SLA breach notification as per CMSF-015. Immediate administrative attention required.
+    </p>
+
+    <p style="color: #666; font-size: 0.9em;">
+        This is an automated notification from the Change Management System.<br>
+        Generated: {{ generated_at }}
+    </p>
+</body>
+</html>
+"""
+
+# Plain-text invitation pieces, joined with blank lines by send_user_invitation
+INVITATION_TEXT_TITLE = """Welcome to Change Management System
+===================================="""
+
+INVITATION_TEXT_ADMIN_NOTE = (
+    "As an administrator, your account requires Multi-Factor Authentication (MFA) for enhanced security."
+)
+
+INVITATION_TEXT_MFA = """MFA Setup Instructions:
+1. Install an authenticator app (Google Authenticator, Authy, or Microsoft Authenticator)
+2. Scan the QR code in the HTML version of this email
+3. Or manually enter this code: {secret}"""
+
+INVITATION_TEXT_MFA_STEP = "4. Enter the 6-digit code from your authenticator app"
+
+INVITATION_TEXT_FOOTER = """Note: This invitation expires in 48 hours.
+
+If you didn't expect this invitation, please ignore this email.
+
+---
+© 2025 Change Management System | TheChangeMakers"""
+
+QR_BLOCK_TMPL = ENV.from_string(_QR_BLOCK_SRC)
+INVITATION_TMPL = ENV.from_string(_INVITATION_SRC)
+CR_SUBMIT_TMPL = ENV.from_string(_CR_SUBMIT_SRC)
+CR_APPROVE_TMPL = ENV.from_string(_CR_APPROVE_SRC)
+CR_REJECT_TMPL = ENV.from_string(_CR_REJECT_SRC)
+SLA_BREACH_WARNING_TMPL = ENV.from_string(_SLA_BREACH_WARNING_SRC)
+CR_CLOSE_TMPL = ENV.from_string(_CR_CLOSE_SRC)
+CR_IMPL_START_TMPL = ENV.from_string(_CR_IMPL_START_SRC)
+CR_IMPL_COMPLETE_TMPL = ENV.from_string(_CR_IMPL_COMPLETE_SRC)
+CR_ROLLBACK_REQUEST_TMPL = ENV.from_string(_CR_ROLLBACK_REQUEST_SRC)
+CR_ROLLBACK_COMPLETE_TMPL = ENV.from_string(_CR_ROLLBACK_COMPLETE_SRC)
+IMPLEMENTATION_COMPLETE_TMPL = ENV.from_string(_IMPLEMENTATION_COMPLETE_SRC)
+CLOSURE_TIMELINE_TMPL = ENV.from_string(_CLOSURE_TIMELINE_SRC)
+SLA_WARNING_TMPL = ENV.from_string(_SLA_WARNING_SRC)
+SLA_BREACH_TMPL = ENV.from_string(_SLA_BREACH_SRC)
@@ -3,9 +3,9 @@ SLA Monitoring Service
 Implements CMSF-015 and CMSF-016
 Background task to monitor implementation deadlines and send alerts
 """
-from datetime import datetime, timedelta
 from flask import current_app
-from app.models import ChangeRequest, CRStatus
+from sqlalchemy import select
+from app.models import ChangeRequest
 from app.services.email_service import EmailService
 from app.extensions import db
 
@@ -20,59 +20,72 @@ def check_sla_deadlines():
     """
     with current_app.app_context():
         try:
-            from datetime import timezone
-            current_time = datetime.now(timezone.utc)
+            # Flag all overdue CRs in one statement (CMSF-015)
+            breached_ids = ChangeRequest.sweep_sla_breaches()
             
-            # Get all CRs that are not yet closed or rolled back
-            active_statuses = [CRStatus.APPROVED, CRStatus.IN_PROGRESS, CRStatus.IMPLEMENTED]
-            active_crs = ChangeRequest.query.filter(
-                ChangeRequest.status.in_(active_statuses),
-                ChangeRequest.implementation_deadline.isnot(None)
+            # Send breach notification to admin (only once)
+            breach_email_ids = db.session.scalars(
+                select(ChangeRequest.id).where(
+                    ChangeRequest.id.in_(breached_ids),
+                    ChangeRequest.sla_warning_sent.is_(False)  # Reuse flag to prevent duplicate breach emails
+                )
+            ).all() if breached_ids else []
+            
+            # CRs due within 24 hours (CMSF-016)
+            warning_ids = db.session.scalars(
+                select(ChangeRequest.id).where(*ChangeRequest.sla_warning_criteria())
             ).all()
             
-            for cr in active_crs:
-                # Skip if already implemented and closed
-                if cr.status == CRStatus.CLOSED:
+            # Mark everything about to be emailed in one statement, before sending,
+            # so a failed or overlapping run (e.g. another worker) never sends twice;
+            # delivery itself happens on the background email pool
+            claimed = set(ChangeRequest.mark_sla_warning_sent(breach_email_ids + warning_ids))
+            breach_email_ids = [cr_id for cr_id in breach_email_ids if cr_id in claimed]
+            warning_ids = [cr_id for cr_id in warning_ids if cr_id in claimed]
+            
+            # Only ids are held for the whole sweep; CRs are streamed in batches.
+            # Every id is already claimed, so one failed email must not stop the rest
+            for cr in ChangeRequest.stream_for_email(breach_email_ids):
+                current_app.logger.warning(f"SLA BREACH detected for CR {cr.cr_number}")
+                try:
+                    EmailService.send_sla_breach_email(cr)
+                except Exception as e:
+                    current_app.logger.error(
+                        f"Failed to send SLA breach email for CR {cr.cr_number} (id {cr.id}): {str(e)}"
+                    )
                     continue
+                current_app.logger.info(f"SLA breach email queued for CR {cr.cr_number}")
+            
+            for cr in ChangeRequest.stream_for_email(warning_ids):
+                hours_remaining = cr.time_until_deadline().total_seconds() / 3600
+                current_app.logger.warning(
+                    f"SLA WARNING: CR {cr.cr_number} has {hours_remaining:.1f} hours until deadline"
+                )
                 
-                # Check for deadline breach (CMSF-015)
-                if cr.check_sla_breach():
-                    current_app.logger.warning(f"SLA BREACH detected for CR {cr.cr_number}")
-                    
-                    # Send breach notification to admin (only once)
-                    if not cr.sla_warning_sent:  # Reuse flag to prevent duplicate breach emails
-                        email_service = EmailService()
-                        email_service.send_sla_breach_email(cr)
-                        cr.sla_warning_sent = True
-                        db.session.commit()
-                        current_app.logger.info(f"SLA breach email sent for CR {cr.cr_number}")
-                
-                # Check for 24-hour warning (CMSF-016)
-                elif cr.is_deadline_warning_needed() and not cr.sla_warning_sent:
-                    time_remaining = cr.time_until_deadline()
-                    if time_remaining:
-                        hours_remaining = time_remaining.total_seconds() / 3600
-                        
-                        # Send warning if less than 24 hours remaining (considering hourly check)
-                        # This catches any time from 0 to 24 hours
-                        if 0 < hours_remaining <= 24:
-                            current_app.logger.warning(
-                                f"SLA WARNING: CR {cr.cr_number} has {hours_remaining:.1f} hours until deadline"
-                            )
-                            
-                            email_service = EmailService()
-                            email_service.send_sla_warning_email(cr)
-                            cr.sla_warning_sent = True
-                            db.session.commit()
-                            current_app.logger.info(f"SLA warning email sent for CR {cr.cr_number}")
+                try:
+                    EmailService.send_sla_warning_email(cr)
+                except Exception as e:
+                    current_app.logger.error(
+                        f"Failed to send SLA warning email for CR {cr.cr_number} (id {cr.id}): {str(e)}"
+                    )
+                    continue
+                current_app.logger.info(f"SLA warning email queued for CR {cr.cr_number}")
             
-            current_app.logger.info(f"SLA check completed. Checked {len(active_crs)} active CRs.")
+            current_app.logger.info(
+                f"SLA check completed. {len(breached_ids)} new breaches, {len(warning_ids)} warnings."
+            )
             
         except Exception as e:
             current_app.logger.error(f"Error in SLA monitoring task: {str(e)}")
             db.session.rollback()
 
 
+def _run_scheduled_check(app):
+    """Scheduler entry point: the job runs on APScheduler's thread, outside any app context"""
+    with app.app_context():
+        check_sla_deadlines()
+
+
 def start_sla_monitoring(app):
     """
     Initialize and start the SLA monitoring background task.
@@ -87,13 +100,18 @@ def start_sla_monitoring(app):
         
         scheduler = BackgroundScheduler()
         
-        # Schedule SLA checks every 10 minutes for more responsive warnings
+        # Schedule SLA checks every 10 minutes for more responsive warnings.
+        # A late or overlapping tick is folded into a single run.
         scheduler.add_job(
-            func=lambda: check_sla_deadlines(),
+            func=_run_scheduled_check,
+            args=[app],
             trigger=IntervalTrigger(minutes=10),
             id='sla_monitoring',
             name='Check SLA deadlines for all CRs',
-            replace_existing=True
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=300
         )
         
         scheduler.start()
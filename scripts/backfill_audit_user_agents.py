@@ -0,0 +1,49 @@
+"""
+Backfill user_agent_id on existing audit logs from their User-Agent text.
+One-shot helper to run after adding the user_agents table and the
+audit_logs.user_agent_id column, and before dropping audit_logs.user_agent.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Integer, String, column, select, table, update
+
+from app import create_app
+from app.extensions import db
+from app.models.audit import _resolve_user_agent_id
+
+
+def main():
+    """Point each audit log at the user_agents row for its User-Agent text"""
+    app = create_app()
+    with app.app_context():
+        # The legacy text column is no longer mapped on AuditLog
+        user_agent = column('user_agent', String)
+        user_agent_id = column('user_agent_id', Integer)
+        audit_logs = table('audit_logs', user_agent, user_agent_id)
+
+        agents = db.session.execute(
+            select(user_agent).distinct()
+            .where(user_agent.isnot(None), user_agent != '', user_agent_id.is_(None))
+        ).scalars().all()
+
+        updated = 0
+        for ua_text in agents:
+            ua_id, _ = _resolve_user_agent_id(db.session, ua_text[:256])
+            result = db.session.execute(
+                update(audit_logs)
+                .where(user_agent == ua_text, user_agent_id.is_(None))
+                .values(user_agent_id=ua_id)
+            )
+            updated += result.rowcount
+        print(f"✓ user_agent_id: {updated} rows updated from {len(agents)} distinct agents")
+
+        db.session.commit()
+        print("\nBackfill complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Backfill denormalized participant emails on existing change requests.
+One-shot helper to run after adding the *_email columns.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+
+from app import create_app
+from app.extensions import db
+from app.models import ChangeRequest, User
+
+
+def main():
+    """Copy each participant's email from users onto change_requests"""
+    app = create_app()
+    with app.app_context():
+        columns = (
+            (ChangeRequest.requester_email, ChangeRequest.requester_id),
+            (ChangeRequest.approver_email, ChangeRequest.approver_id),
+            (ChangeRequest.implementer_email, ChangeRequest.implementer_id),
+            (ChangeRequest.closed_by_email, ChangeRequest.closed_by_id),
+        )
+        for email_column, user_column in columns:
+            email_of_user = select(User.email).where(User.id == user_column).scalar_subquery()
+            result = db.session.execute(
+                update(ChangeRequest)
+                .where(email_column.is_(None), user_column.isnot(None))
+                .values({email_column: email_of_user})
+                .execution_options(synchronize_session=False)
+            )
+            print(f"✓ {email_column.key}: {result.rowcount} rows updated")
+        
+        db.session.commit()
+        print("\nBackfill complete!")
+
+
+if __name__ == "__main__":
+    main()
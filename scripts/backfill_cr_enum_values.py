@@ -0,0 +1,47 @@
+"""
+Rewrite change request enum columns from member names to values.
+One-shot helper to run after switching status/priority/risk_level from the
+native Enum columns (which stored e.g. 'APPROVED') to plain VARCHAR values
+('approved'), and before adding the ck_cr_* CHECK constraints.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import String, column, table, update
+
+from app import create_app
+from app.extensions import db
+from app.models import CRPriority, CRRiskLevel, CRStatus
+
+
+def main():
+    """Replace each stored member name with the member's value"""
+    app = create_app()
+    with app.app_context():
+        # Plain String columns, so the names are not run through StrEnumType
+        for column_name, enum_class in (
+            ('status', CRStatus),
+            ('priority', CRPriority),
+            ('risk_level', CRRiskLevel),
+        ):
+            col = column(column_name, String)
+            change_requests = table('change_requests', col)
+            updated = 0
+            for member in enum_class:
+                result = db.session.execute(
+                    update(change_requests)
+                    .where(col == member.name)
+                    .values({column_name: member.value})
+                )
+                updated += result.rowcount
+            print(f"✓ {column_name}: {updated} rows updated")
+
+        db.session.commit()
+        print("\nBackfill complete!")
+
+
+if __name__ == "__main__":
+    main()
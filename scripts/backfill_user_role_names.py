@@ -0,0 +1,35 @@
+"""
+Backfill the denormalized role name on existing users.
+One-shot helper to run after adding the users.role_name column.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+
+from app import create_app
+from app.extensions import db
+from app.models import Role, User
+
+
+def main():
+    """Copy each user's role name from roles onto users"""
+    app = create_app()
+    with app.app_context():
+        name_of_role = select(Role.name).where(Role.id == User.role_id).scalar_subquery()
+        result = db.session.execute(
+            update(User)
+            .values(role_name=name_of_role)
+            .execution_options(synchronize_session=False)
+        )
+        print(f"✓ role_name: {result.rowcount} rows updated")
+        
+        db.session.commit()
+        print("\nBackfill complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,7 @@ from app import create_app
 from app.extensions import db
 from app.models import (
     User, Project, ProjectMembership, ChangeRequest, 
-    CRAttachment, CRComment, UserInvitation, AuditLog
+    CRAttachment, CRComment, UserInvitation, AuditLog, UserAgent
 )
 
 def clear_pycache(root_dir):
@@ -90,6 +90,9 @@ def clear_database(admin_email):
     count = AuditLog.query.delete()
     print(f"   Deleted {count} audit logs")
     
+    count = UserAgent.query.delete()
+    print(f"   Deleted {count} user agents")
+    
     # 2. Delete CR-related records
     count = CRComment.query.delete()
     print(f"   Deleted {count} CR comments")
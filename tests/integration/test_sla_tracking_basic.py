@@ -13,7 +13,7 @@ def test_sla_tracking_basic(monkeypatch, app, db_session, requester_user, approv
             return self
         def __exit__(self, *exc):
             return False
-        def starttls(self):
+        def starttls(self, context=None):
             pass
         def login(self, *a, **k):
             pass
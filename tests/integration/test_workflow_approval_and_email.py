@@ -13,7 +13,7 @@ class DummySMTP:
         return self
     def __exit__(self, *exc):
         return False
-    def starttls(self):
+    def starttls(self, context=None):
         pass
     def login(self, *a, **k):
         pass
@@ -1,11 +1,12 @@
 import os
+import types
 import uuid
 import pytest
 from flask import Flask
 
 from app import create_app
 from app.extensions import db as _db
-from app.models import Role, Permission, User, Project, ProjectMembership
+from app.models import Role, Permission, User, Project, ProjectMembership, ChangeRequest, CRPriority, CRStatus
 
 
 @pytest.fixture(scope="session")
@@ -111,3 +112,79 @@ def add_member(project, user, role_name=None):
     _db.session.add(pm)
     _db.session.commit()
     return pm
+
+
+@pytest.fixture()
+def make_cr(db_session, project, requester_user):
+    """Factory committing a CR in the test project; pass only the fields a test cares about"""
+    def make(**fields):
+        values = dict(
+            project_id=project.id,
+            title="Test CR",
+            description="Change request used by a unit test",
+            priority=CRPriority.LOW,
+            requester_id=requester_user.id,
+            status=CRStatus.PENDING_APPROVAL,
+        )
+        values.update(fields)
+        values.setdefault("cr_number", ChangeRequest.generate_cr_number())
+        cr = ChangeRequest(**values)
+        db_session.add(cr)
+        db_session.commit()
+        return cr
+    return make
+
+
+class DummySMTP:
+    """Mock SMTP class for testing"""
+    def __init__(self, *a, **k):
+        pass
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def starttls(self, context=None):
+        pass
+    def login(self, *a, **k):
+        pass
+    def send_message(self, msg):
+        # emulate success
+        return True
+    def noop(self):
+        return (250, b"OK")
+    def quit(self):
+        pass
+    def close(self):
+        pass
+
+
+def html_body(msg):
+    """Decoded text/html part of a sent message"""
+    html = next(part for part in msg.walk() if part.get_content_type() == "text/html")
+    return html.get_payload(decode=True).decode()
+
+
+@pytest.fixture()
+def smtp_outbox(monkeypatch, app):
+    """
+    Configure SMTP and capture what is sent instead of delivering it
+    Yields a namespace with .messages (sent EmailMessages, in order) and
+    .connections (one entry per SMTP session opened).
+    """
+    from app.services.email_service import _SMTP_SESSIONS
+
+    outbox = types.SimpleNamespace(messages=[], connections=[])
+
+    class CapturingSMTP(DummySMTP):
+        def __init__(self, *a, **k):
+            outbox.connections.append(self)
+
+        def send_message(self, msg):
+            outbox.messages.append(msg)
+
+    monkeypatch.setitem(app.config, "SMTP_USERNAME", "user")
+    monkeypatch.setitem(app.config, "SMTP_PASSWORD", "pass")
+    monkeypatch.setattr("smtplib.SMTP", CapturingSMTP)
+    yield outbox
+    # Email workers park their connection per thread; do not leak it into other tests
+    _SMTP_SESSIONS.__dict__.pop("parked", None)
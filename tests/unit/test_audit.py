@@ -1,4 +1,5 @@
 """Unit tests for audit logging functionality"""
+from app.audit.logger import flush_audit_queue
 from app.models.audit import AuditLog, AuditEventType, AuditEventCategory
 
 
@@ -125,3 +126,153 @@ def test_audit_log_categories(db_session, admin_user):
         success=True,
     )
     assert user_log.event_category == AuditEventCategory.USER_MANAGEMENT
+
+
+def test_audit_log_enqueue_and_flush(db_session, requester_user):
+    """Test queued audit logs are written in one batch"""
+    before = AuditLog.query.filter_by(event_type=AuditEventType.CR_VIEWED).count()
+    for i in range(3):
+        AuditLog.enqueue(
+            AuditEventType.CR_VIEWED,
+            AuditEventCategory.CHANGE_REQUEST,
+            user=requester_user,
+            description=f"viewed {i}",
+            resource_type="ChangeRequest",
+            resource_id=i,
+        )
+    assert AuditLog.pending_count() == 3
+
+    assert AuditLog.flush_pending() == 3
+    assert AuditLog.pending_count() == 0
+    logs = AuditLog.query.filter_by(event_type=AuditEventType.CR_VIEWED).all()
+    assert len(logs) == before + 3
+    assert all(log.timestamp is not None for log in logs)
+    assert logs[-1].username == requester_user.username
+
+
+def test_audit_log_flush_leaves_session_uncommitted(db_session, requester_user):
+    """Test flushing queued audit logs does not commit pending request changes"""
+    original = requester_user.first_name
+    requester_user.first_name = "Rejected"
+    AuditLog.enqueue(
+        AuditEventType.CR_VIEWED,
+        AuditEventCategory.CHANGE_REQUEST,
+        user=requester_user,
+        description="viewed during rejected edit",
+    )
+
+    assert AuditLog.flush_pending() == 1
+    db_session.rollback()
+    assert requester_user.first_name == original
+    # The audit row itself was committed on its own connection
+    assert AuditLog.query.filter_by(event_description="viewed during rejected edit").count() == 1
+
+
+def test_audit_queue_drops_batch_after_retries(app, db_session):
+    """Test a batch the database keeps rejecting is dropped after the last retry"""
+    # event_type is NOT NULL, so this entry can never be written
+    AuditLog.enqueue(None, AuditEventCategory.CHANGE_REQUEST, description="poison")
+
+    for _ in range(app.config['AUDIT_MAX_RETRIES']):
+        assert flush_audit_queue(force=True) == 0
+        assert AuditLog.pending_count() == 1
+    assert flush_audit_queue(force=True) == 0
+    assert AuditLog.pending_count() == 0
+
+    # Later entries are no longer blocked
+    AuditLog.enqueue(AuditEventType.CR_VIEWED, AuditEventCategory.CHANGE_REQUEST, description="after poison")
+    assert flush_audit_queue(force=True) == 1
+
+
+def test_audit_queue_is_bounded(app, db_session, monkeypatch):
+    """Test the oldest queued entries are dropped once the queue is full"""
+    monkeypatch.setitem(app.config, 'AUDIT_QUEUE_MAX', 2)
+    for i in range(3):
+        AuditLog.enqueue(AuditEventType.CR_VIEWED, AuditEventCategory.CHANGE_REQUEST, description=f"bounded {i}")
+    assert AuditLog.pending_count() == 2
+
+    assert AuditLog.flush_pending() == 2
+    written = {log.event_description for log in AuditLog.query.filter(AuditLog.event_description.like("bounded %"))}
+    assert written == {"bounded 1", "bounded 2"}
+
+
+def test_audit_log_flush_mixed_batch(app, db_session, requester_user, monkeypatch):
+    """Test a batch mixing anonymous and authenticated entries keeps every user"""
+    monkeypatch.setitem(app.config, 'AUDIT_BATCH_SIZE', 4)
+    for label, user in (("anon-first", None), ("user-second", requester_user),
+                        ("user-third", requester_user), ("anon-fourth", None)):
+        AuditLog.enqueue(
+            AuditEventType.CR_VIEWED,
+            AuditEventCategory.CHANGE_REQUEST,
+            user=user,
+            description=f"mixed {label}",
+        )
+
+    assert flush_audit_queue() == 4
+    logs = AuditLog.query.filter(AuditLog.event_description.like("mixed %")).all()
+    usernames = {log.event_description: log.username for log in logs}
+    assert usernames == {
+        "mixed anon-first": None,
+        "mixed user-second": requester_user.username,
+        "mixed user-third": requester_user.username,
+        "mixed anon-fourth": None,
+    }
+
+
+def test_audit_log_to_dict(db_session, admin_user):
+    """Test audit log serialization includes every column"""
+    log = AuditLog.create_log(
+        event_type=AuditEventType.USER_CREATED,
+        event_category=AuditEventCategory.USER_MANAGEMENT,
+        user=admin_user,
+        description="Created new user",
+        metadata={"new_user": "someone"},
+    )
+    data = log.to_dict()
+    assert data['id'] == log.id
+    assert data['username'] == admin_user.username
+    assert data['event_description'] == "Created new user"
+    assert data['extra_data'] == {"new_user": "someone"}
+    assert data['timestamp'] == log.timestamp.isoformat()
+    assert len(data) == 17
+
+
+def test_audit_log_user_agent_is_shared(app, db_session, admin_user):
+    """Test identical User-Agent headers are stored once"""
+    from flask import request
+    from app.models import UserAgent
+
+    logs = []
+    for _ in range(2):
+        with app.test_request_context('/', headers={'User-Agent': 'UnitTestBrowser/1.0'}):
+            logs.append(AuditLog.create_log(
+                event_type=AuditEventType.LOGIN_SUCCESS,
+                event_category=AuditEventCategory.AUTHENTICATION,
+                user=admin_user,
+                request=request,
+            ))
+    assert logs[0].user_agent_id == logs[1].user_agent_id
+    assert logs[1].user_agent == 'UnitTestBrowser/1.0'
+    assert UserAgent.query.filter_by(ua_text='UnitTestBrowser/1.0').count() == 1
+
+
+def test_user_agent_cache_survives_unrelated_rollback(db_session):
+    """Test cached User-Agent ids are only forgotten when their insert is rolled back"""
+    from app.models import UserAgent
+    from app.models.audit import _user_agent_id
+
+    db_session.rollback()
+    ua_id = UserAgent.get_or_create_id('CacheProbe/1.0')
+    db_session.commit()
+    assert _user_agent_id.cache_info().currsize >= 1
+
+    # Nothing inserted in this transaction: the cached id stays
+    db_session.rollback()
+    hits = _user_agent_id.cache_info().hits
+    assert UserAgent.get_or_create_id('CacheProbe/1.0') == ua_id
+    assert _user_agent_id.cache_info().hits == hits + 1
+
+    # Rolling back an insert drops the ids that may no longer exist
+    UserAgent.get_or_create_id('CacheProbe/2.0')
+    db_session.rollback()
+    assert _user_agent_id.cache_info().currsize == 0
@@ -1,7 +1,7 @@
 """Unit tests for change request models and workflows"""
 from datetime import datetime, timedelta, timezone
 
-from app.models import ChangeRequest, CRStatus, CRPriority, CRRiskLevel
+from app.models import ChangeRequest, CRNumberCounter, CRStatus, CRPriority, CRRiskLevel
 
 
 def test_submit_change_request_model(db_session, requester_user, project):
@@ -38,6 +38,46 @@ def test_cr_number_generation(db_session):
     assert len(cr_number) > 3
 
 
+def test_cr_number_generation_is_sequential(db_session):
+    """Consecutive CR numbers come from the per-day counter"""
+    first = ChangeRequest.generate_cr_number()
+    second = ChangeRequest.generate_cr_number()
+    assert first[:-4] == second[:-4]
+    assert int(second[-4:]) == int(first[-4:]) + 1
+
+
+def test_cr_number_counter_continues_existing_numbers(db_session, requester_user, project):
+    """A day without a counter row continues after CR numbers already issued"""
+    today = datetime.now(timezone.utc).date()
+    prefix = f"CR-{today.strftime('%Y%m%d')}"
+    CRNumberCounter.query.filter_by(day=today).delete()
+    db_session.add(ChangeRequest(
+        cr_number=f"{prefix}-0999",
+        project_id=project.id,
+        requester_id=requester_user.id,
+        title="Numbered before the counter",
+        description="d",
+        justification="j",
+        status=CRStatus.DRAFT,
+        priority=CRPriority.LOW,
+        risk_level=CRRiskLevel.LOW,
+    ))
+    db_session.flush()
+
+    assert ChangeRequest.generate_cr_number() == f"{prefix}-1000"
+
+
+def test_cr_number_prefix_follows_the_day(db_session, monkeypatch):
+    """A prefix cached on a previous day is rebuilt for today's number"""
+    from app.models import change_request
+
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    monkeypatch.setattr(change_request, "_cr_prefix_cache", (yesterday, "CR-STALE"))
+
+    cr_number = ChangeRequest.generate_cr_number()
+    assert cr_number.startswith(f"CR-{datetime.now(timezone.utc):%Y%m%d}-")
+
+
 def test_approval_workflow_transitions(db_session, requester_user, approver_user, project):
     """Test the approval workflow from pending to approved"""
     from tests.unit.conftest import add_member
@@ -63,7 +103,9 @@ def test_approval_workflow_transitions(db_session, requester_user, approver_user
 
     assert cr.status == CRStatus.APPROVED
     assert cr.approver_id == approver_user.id
+    assert cr.approver_email == approver_user.email
     assert cr.approval_comments == "Looks good"
+    assert cr.get_timeline()['approved']['user'] == approver_user.email
 
 
 def test_rejection_workflow(db_session, requester_user, approver_user, project):
@@ -224,3 +266,96 @@ def test_timeline_tracking(db_session, requester_user, project):
     timeline = cr.get_timeline()
     assert timeline is not None
     assert len(timeline) > 0
+
+
+def test_can_access_cr_uses_project_members(db_session, requester_user, approver_user, implementer_user, project):
+    """Test CR access checks against the project's active members"""
+    from tests.unit.conftest import add_member
+    add_member(project, requester_user, "requester")
+    add_member(project, approver_user, "approver")
+
+    cr = ChangeRequest(
+        cr_number=ChangeRequest.generate_cr_number(),
+        project_id=project.id,
+        title="Access check",
+        description="CR used for access checks.",
+        priority=CRPriority.LOW,
+        requester_id=requester_user.id,
+        status=CRStatus.APPROVED,
+    )
+    db_session.add(cr)
+    db_session.commit()
+
+    assert requester_user.can_access_cr(cr) is True
+    assert approver_user.can_access_cr(cr) is True
+    # Implementer is not a member of the project
+    assert implementer_user.can_access_cr(cr) is False
+
+
+def test_create_change_request_with_bulk_children(db_session, requester_user, project):
+    """Attachments and comments passed to the create service are bulk inserted"""
+    from app.change_requests.services import create_change_request
+
+    cr = create_change_request(
+        "Bulk CR",
+        "Enough description characters for validation.",
+        created_by=requester_user,
+        cr_number=ChangeRequest.generate_cr_number(),
+        project_id=project.id,
+        attachments=[
+            {'filename': f'f{i}.txt', 'original_filename': f'f{i}.txt', 'file_path': f'/tmp/f{i}.txt'}
+            for i in range(3)
+        ],
+        comments=[{'user_id': requester_user.id, 'comment': 'First note'}],
+    )
+    db_session.commit()
+
+    assert cr.requester_email == requester_user.email
+    assert len(cr.attachments) == 3
+    assert [c.comment for c in cr.comments] == ['First note']
+
+
+def test_cr_enums_stored_as_values(db_session, requester_user, project):
+    """Status/priority/risk are plain strings in the database and Enums in Python"""
+    from sqlalchemy import text
+
+    cr = ChangeRequest(
+        cr_number=ChangeRequest.generate_cr_number(),
+        project_id=project.id,
+        title="Enum storage",
+        description="Enough description characters for validation.",
+        priority="high",
+        requester_id=requester_user.id,
+    )
+    db_session.add(cr)
+    db_session.commit()
+
+    row = db_session.execute(
+        text("SELECT status, priority, risk_level FROM change_requests WHERE id = :id"), {"id": cr.id}
+    ).one()
+    assert tuple(row) == ("draft", "high", "low")
+
+    db_session.expire(cr)
+    assert cr.status is CRStatus.DRAFT
+    assert cr.priority is CRPriority.HIGH
+    assert ChangeRequest.query.filter_by(id=cr.id, status="draft").count() == 1
+
+
+def test_cr_enum_labels_are_upper_case_values():
+    """Test CR enum labels match value.upper() and are computed once per member"""
+    assert CRStatus.IN_PROGRESS.label == "IN_PROGRESS"
+    assert CRPriority.CRITICAL.label == "CRITICAL"
+    assert CRRiskLevel.LOW.label == "LOW"
+    assert CRStatus.CLOSED.label is CRStatus.CLOSED.label
+    assert "label" not in CRStatus.__members__
+
+
+def test_cr_enum_type_rejects_member_names():
+    """Old native-Enum member names must be backfilled, not silently mapped"""
+    import pytest
+    from app.models.change_request import StrEnumType
+
+    enum_type = StrEnumType(CRStatus)
+    assert enum_type.process_result_value("approved", None) is CRStatus.APPROVED
+    with pytest.raises(ValueError):
+        enum_type.process_result_value("APPROVED", None)
@@ -1,29 +1,12 @@
 """Unit tests for email notification functionality"""
-import types
-import builtins
-
-from app.services.email_service import EmailService
-from app.models import ChangeRequest, CRPriority, CRStatus
-
-
-class DummySMTP:
-    """Mock SMTP class for testing"""
-    def __init__(self, *a, **k):
-        pass
-    def __enter__(self):
-        return self
-    def __exit__(self, *exc):
-        return False
-    def starttls(self):
-        pass
-    def login(self, *a, **k):
-        pass
-    def send_message(self, msg):
-        # emulate success
-        return True
-
-
-def test_email_notifications_sends(monkeypatch, app, db_session, requester_user, approver_user, project):
+from datetime import datetime, timedelta
+
+from app.services.email_service import EmailService, _SMTP_SESSIONS
+from app.models import CRPriority, CRStatus
+from tests.unit.conftest import DummySMTP, add_member, html_body
+
+
+def test_email_notifications_sends(monkeypatch, app, make_cr, requester_user, approver_user, project):
     """Test that email notifications are sent successfully"""
     # Force SMTP config to look configured
     app.config.update(
@@ -36,28 +19,17 @@ def test_email_notifications_sends(monkeypatch, app, db_session, requester_user,
     monkeypatch.setattr("smtplib.SMTP", DummySMTP)
 
     # Create CR and call one of the notification methods
-    from tests.unit.conftest import add_member
     add_member(project, requester_user, "requester")
     add_member(project, approver_user, "approver")
 
-    cr = ChangeRequest(
-        cr_number=ChangeRequest.generate_cr_number(),
-        project_id=project.id,
-        title="Notify",
-        description="desc long enough for validation",
-        priority=CRPriority.LOW,
-        requester_id=requester_user.id,
-        status=CRStatus.PENDING_APPROVAL,
-    )
-    db_session.add(cr)
-    db_session.commit()
+    cr = make_cr(title="Notify")
 
     ok = EmailService.send_cr_submission_notification(cr, [approver_user])
     # Method returns None but should not raise; SMTP path used
     assert ok is None
 
 
-def test_email_approval_notification(monkeypatch, app, db_session, requester_user, approver_user, implementer_user, project):
+def test_email_approval_notification(monkeypatch, app, make_cr, requester_user, approver_user, implementer_user, project):
     """Test approval notification email"""
     app.config.update(
         SMTP_USERNAME="user",
@@ -67,28 +39,17 @@ def test_email_approval_notification(monkeypatch, app, db_session, requester_use
     )
     monkeypatch.setattr("smtplib.SMTP", DummySMTP)
 
-    from tests.unit.conftest import add_member
     add_member(project, requester_user, "requester")
     add_member(project, implementer_user, "implementer")
 
-    cr = ChangeRequest(
-        cr_number=ChangeRequest.generate_cr_number(),
-        project_id=project.id,
-        title="Approved CR",
-        description="CR that will be approved",
-        priority=CRPriority.MEDIUM,
-        requester_id=requester_user.id,
-        status=CRStatus.APPROVED,
-        approver_id=approver_user.id,
-    )
-    db_session.add(cr)
-    db_session.commit()
+    cr = make_cr(title="Approved CR", priority=CRPriority.MEDIUM, status=CRStatus.APPROVED,
+                 approver_id=approver_user.id)
 
     result = EmailService.send_cr_approval_notification(cr, [implementer_user])
     assert result is None  # Successful send returns None
 
 
-def test_email_rejection_notification(monkeypatch, app, db_session, requester_user, approver_user, project):
+def test_email_rejection_notification(monkeypatch, app, make_cr, requester_user, project):
     """Test rejection notification email"""
     app.config.update(
         SMTP_USERNAME="user",
@@ -98,28 +59,16 @@ def test_email_rejection_notification(monkeypatch, app, db_session, requester_us
     )
     monkeypatch.setattr("smtplib.SMTP", DummySMTP)
 
-    from tests.unit.conftest import add_member
     add_member(project, requester_user, "requester")
 
-    cr = ChangeRequest(
-        cr_number=ChangeRequest.generate_cr_number(),
-        project_id=project.id,
-        title="Rejected CR",
-        description="CR that will be rejected",
-        priority=CRPriority.LOW,
-        requester_id=requester_user.id,
-        status=CRStatus.REJECTED,
-        rejection_reason="Not feasible at this time",
-    )
-    db_session.add(cr)
-    db_session.commit()
+    cr = make_cr(title="Rejected CR", status=CRStatus.REJECTED, rejection_reason="Not feasible at this time")
 
     email_service = EmailService()
     result = email_service.send_cr_rejection_notification(cr, "Not feasible at this time")
     assert result is None  # Successful send returns None
 
 
-def test_email_sla_warning(monkeypatch, app, db_session, requester_user, project):
+def test_email_sla_warning(monkeypatch, app, make_cr):
     """Test SLA warning email"""
     app.config.update(
         SMTP_USERNAME="user",
@@ -130,26 +79,19 @@ def test_email_sla_warning(monkeypatch, app, db_session, requester_user, project
     monkeypatch.setattr("smtplib.SMTP", DummySMTP)
 
     # CR with implementation_deadline set
-    from datetime import datetime, timedelta
-    cr = ChangeRequest(
-        cr_number=ChangeRequest.generate_cr_number(),
-        project_id=project.id,
+    cr = make_cr(
         title="SLA Warning CR",
-        description="CR approaching deadline",
         priority=CRPriority.HIGH,
-        requester_id=requester_user.id,
         status=CRStatus.IN_PROGRESS,
-        implementation_deadline=datetime.now() + timedelta(hours=12),  # Set deadline
+        implementation_deadline=datetime.now() + timedelta(hours=12),
     )
-    db_session.add(cr)
-    db_session.commit()
 
     email_service = EmailService()
     result = email_service.send_sla_warning_email(cr)
     assert result is None  # Successful send returns None
 
 
-def test_email_without_smtp_config(app, db_session, requester_user, approver_user, project):
+def test_email_without_smtp_config(app, make_cr, requester_user, approver_user, project):
     """Test that email gracefully handles missing SMTP configuration"""
     # Clear SMTP config
     app.config.update(
@@ -157,21 +99,383 @@ def test_email_without_smtp_config(app, db_session, requester_user, approver_use
         SMTP_PASSWORD=None,
     )
 
-    from tests.unit.conftest import add_member
     add_member(project, requester_user, "requester")
 
-    cr = ChangeRequest(
-        cr_number=ChangeRequest.generate_cr_number(),
-        project_id=project.id,
-        title="No SMTP CR",
-        description="Testing without SMTP config",
-        priority=CRPriority.LOW,
-        requester_id=requester_user.id,
-        status=CRStatus.PENDING_APPROVAL,
-    )
-    db_session.add(cr)
-    db_session.commit()
+    cr = make_cr(title="No SMTP CR")
 
     # Should not raise exception
     result = EmailService.send_cr_submission_notification(cr, [approver_user])
     assert result is None  # Returns None when SMTP not configured
+
+
+def test_batch_notification_reuses_one_connection(smtp_outbox, make_cr, approver_user, admin_user):
+    """Test batch notifiers send every message over a single SMTP session"""
+    cr = make_cr()
+
+    EmailService.send_cr_submission_notification(cr, [approver_user, admin_user])
+    assert len(smtp_outbox.connections) == 1
+    assert [m["To"] for m in smtp_outbox.messages] == [approver_user.email, admin_user.email]
+
+
+def test_send_email_uses_background_pool(monkeypatch, app):
+    """Test emails are delivered from the email pool when one is configured"""
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    app.config.update(SMTP_USERNAME="user", SMTP_PASSWORD="pass")
+    delivered = []
+
+    class ThreadSMTP(DummySMTP):
+        def send_message(self, msg):
+            delivered.append((msg['To'], threading.current_thread().name))
+
+    monkeypatch.setattr("smtplib.SMTP", ThreadSMTP)
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email")
+    monkeypatch.setitem(app.extensions, "email_pool", pool)
+
+    assert EmailService._send_email("bg@test.local", "Background", "<p>hi</p>") is True
+    pool.shutdown(wait=True)
+    assert len(delivered) == 1
+    assert delivered[0][0] == "bg@test.local"
+    assert delivered[0][1].startswith("email")
+
+
+def test_notification_html_escapes_cr_fields(smtp_outbox, make_cr, approver_user):
+    """Test compiled notification templates escape user-supplied CR fields"""
+    cr = make_cr(title="<b>Escaped</b>")
+
+    EmailService.send_cr_submission_notification(cr, [approver_user])
+    assert len(smtp_outbox.messages) == 1
+    body = html_body(smtp_outbox.messages[0])
+    assert "&lt;b&gt;Escaped&lt;/b&gt;" in body
+    assert cr.cr_number in body
+
+
+def test_build_message_sets_each_header_once(app):
+    """Test built messages carry the static headers exactly once"""
+    app.config.update(SMTP_FROM_EMAIL="noreply@test.local", SMTP_FROM_NAME="CMS")
+    config = EmailService._get_smtp_config()
+    msg = EmailService._build_message(config, "to@test.local", "Headers", "<p>hi</p>")
+
+    assert msg["From"] == "CMS <noreply@test.local>"
+    assert msg.get_all("MIME-Version") == ["1.0"]
+    assert msg.get_all("X-Mailer") == ["Python-SMTP"]
+
+
+def test_message_ids_are_unique_per_message(app):
+    """Test identical emails still get distinct RFC 5322 Message-IDs"""
+    config = EmailService._get_smtp_config()
+    first = EmailService._build_message(config, "to@test.local", "Same", "<p>same</p>")
+    second = EmailService._build_message(config, "to@test.local", "Same", "<p>same</p>")
+
+    assert first["Message-ID"] != second["Message-ID"]
+    assert first["Message-ID"].startswith("<")
+    assert first["Message-ID"].endswith("@changemanagement.com>")
+
+
+def test_batch_notification_greets_each_recipient(smtp_outbox, make_cr, db_session, approver_user, admin_user):
+    """Test the shared batch body is personalised per recipient"""
+    approver_user.first_name = "<Ann>"
+    admin_user.first_name = "Bob"
+    db_session.commit()
+    cr = make_cr()
+
+    EmailService.send_cr_submission_notification(cr, [approver_user, admin_user])
+    sent = {m["To"]: html_body(m) for m in smtp_outbox.messages}
+    assert "Hello &lt;Ann&gt;," in sent[approver_user.email]
+    assert "Hello Bob," in sent[admin_user.email]
+    assert "recipient-name" not in sent[admin_user.email]
+
+
+def test_invitation_qr_png_is_memoized(smtp_outbox, admin_user):
+    """Test re-sending an MFA invitation reuses the rendered QR image"""
+    from app.services.email_service import _render_qr_png
+
+    uri = f"otpauth://totp/CMS:{admin_user.email}?secret=JBSWY3DPEHPK3PXP"
+    _render_qr_png.cache_clear()
+
+    for _ in range(2):
+        EmailService.send_user_invitation(admin_user, "token", mfa_secret="JBSWY3DPEHPK3PXP", qr_code_data=uri)
+
+    assert _render_qr_png.cache_info().hits == 1
+    images = [p for p in smtp_outbox.messages[1].walk() if p.get_content_type() == "image/png"]
+    assert images and images[0].get_payload(decode=True).startswith(b"\x89PNG")
+
+
+def test_implementation_start_links_use_configured_base_url(monkeypatch, app, smtp_outbox, make_cr, implementer_user):
+    """Test CR links are built from the app's BASE_URL setting"""
+    monkeypatch.setitem(app.config, "BASE_URL", "https://cms.example.com")
+    cr = make_cr(implementer_id=implementer_user.id, status=CRStatus.APPROVED)
+
+    EmailService.send_cr_implementation_start(cr)
+    assert f"https://cms.example.com/change-requests/{cr.id}" in html_body(smtp_outbox.messages[0])
+
+
+def test_batch_notification_dedupes_and_shares_body(smtp_outbox, make_cr, requester_user, approver_user, implementer_user):
+    """Test fan-out skips repeated recipients and reuses one body for identical HTML"""
+    cr = make_cr(approver_id=approver_user.id, implementer_id=implementer_user.id, status=CRStatus.CLOSED)
+    sent = smtp_outbox.messages
+
+    EmailService.send_cr_submission_notification(cr, [approver_user, approver_user])
+    assert [m["To"] for m in sent] == [approver_user.email]
+
+    sent.clear()
+    EmailService.send_cr_closure_notification(cr)
+    assert [m["To"] for m in sent] == [requester_user.email, approver_user.email, implementer_user.email]
+    assert len({m["Message-ID"] for m in sent}) == 3
+    assert all(m.get_payload(0) is sent[0].get_payload(0) for m in sent)
+
+
+def test_smtp_connections_share_verifying_tls_context(monkeypatch, app):
+    """Test STARTTLS uses one certificate-verifying context for every connection"""
+    import ssl
+
+    app.config.update(SMTP_USERNAME="user", SMTP_PASSWORD="pass")
+    contexts = []
+    timeouts = []
+
+    class TLSSMTP(DummySMTP):
+        def __init__(self, *a, **k):
+            timeouts.append(k.get("timeout"))
+        def starttls(self, context=None):
+            contexts.append(context)
+
+    monkeypatch.setattr("smtplib.SMTP", TLSSMTP)
+
+    EmailService._send_email("one@test.local", "TLS", "<p>1</p>")
+    EmailService._send_email("two@test.local", "TLS", "<p>2</p>")
+    assert len(contexts) == 2 and contexts[0] is contexts[1]
+    assert contexts[0].verify_mode == ssl.CERT_REQUIRED
+    assert timeouts == [app.config["SMTP_TIMEOUT"]] * 2
+
+
+def test_invitation_plain_text_omits_unused_sections(smtp_outbox, requester_user):
+    """Test the plain-text invitation only includes the sections that apply"""
+    EmailService.send_user_invitation(requester_user, "token")
+    text = next(p for p in smtp_outbox.messages[0].walk() if p.get_content_type() == "text/plain")
+    body = text.get_content()
+    assert "/auth/accept-invitation/token" in body
+    assert "MFA" not in body
+    assert "\n\n\n" not in body
+
+
+def test_unconfigured_smtp_skips_building_invitation(monkeypatch, app, admin_user):
+    """Test invitations skip QR rendering and MIME assembly when SMTP is off"""
+    from app.services.email_service import _render_qr_png
+
+    monkeypatch.setitem(app.config, "SMTP_USERNAME", None)
+    built = []
+    monkeypatch.setattr(EmailService, "_build_body", staticmethod(lambda *a, **k: built.append(a)))
+    _render_qr_png.cache_clear()
+
+    assert EmailService.is_configured() is False
+    assert EmailService.send_user_invitation(admin_user, "token", mfa_secret="JBSWY3DPEHPK3PXP",
+                                             qr_code_data="otpauth://totp/x?secret=JBSWY3DPEHPK3PXP") is False
+    assert _render_qr_png.cache_info().misses == 0
+    assert built == []
+
+
+def test_closure_timeline_email_renders_timeline(smtp_outbox, make_cr, approver_user, admin_user):
+    """Test the closure timeline email lists events and escapes closure notes"""
+    now = datetime.now()
+    cr = make_cr(
+        approver_id=approver_user.id,
+        closed_by_id=approver_user.id,
+        status=CRStatus.CLOSED,
+        approved_date=now - timedelta(hours=2),
+        closed_date=now,
+        closure_notes="<i>done</i>",
+    )
+
+    EmailService.send_closure_timeline_email(cr)
+    mine = [m for m in smtp_outbox.messages if m["To"] == admin_user.email]
+    assert len(mine) == 1
+    body = html_body(mine[0])
+    assert f"Dear {admin_user.username}," in body
+    assert "✅ Approved" in body and "🏁 Closed" in body
+    assert "&lt;i&gt;done&lt;/i&gt;" in body
+
+
+def test_background_delivery_retries_transient_failures(monkeypatch, app):
+    """Test background sends retry 4xx replies but not permanent rejections"""
+    import smtplib
+
+    app.config.update(SMTP_USERNAME="user", SMTP_PASSWORD="pass")
+    monkeypatch.setitem(app.config, "EMAIL_RETRY_BACKOFF", 0)
+    attempts = {}
+
+    class FlakySMTP(DummySMTP):
+        def send_message(self, msg):
+            attempts[msg["To"]] = attempts.get(msg["To"], 0) + 1
+            if msg["To"] == "busy@test.local" and attempts[msg["To"]] == 1:
+                raise smtplib.SMTPDataError(451, b"try again later")
+            if msg["To"] == "bad@test.local":
+                raise smtplib.SMTPDataError(550, b"no such user")
+
+    monkeypatch.setattr("smtplib.SMTP", FlakySMTP)
+    config = EmailService._get_smtp_config()
+    messages = [EmailService._build_message(config, to, "Retry", "<p>x</p>")
+                for to in ("busy@test.local", "bad@test.local")]
+
+    try:
+        assert EmailService._deliver_in_background(app, messages) == 1
+    finally:
+        _SMTP_SESSIONS.__dict__.pop("parked", None)
+    assert attempts == {"busy@test.local": 2, "bad@test.local": 1}
+
+
+def test_refused_recipient_is_not_retried(monkeypatch, app):
+    """Test a 550 recipient refusal is treated as permanent, not retried with backoff"""
+    import smtplib
+
+    app.config.update(SMTP_USERNAME="user", SMTP_PASSWORD="pass")
+    monkeypatch.setitem(app.config, "EMAIL_RETRY_BACKOFF", 0)
+    attempts = []
+
+    class RefusingSMTP(DummySMTP):
+        def send_message(self, msg):
+            attempts.append(msg["To"])
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"no such user")})
+
+    monkeypatch.setattr("smtplib.SMTP", RefusingSMTP)
+    config = EmailService._get_smtp_config()
+    messages = [EmailService._build_message(config, "gone@test.local", "Refused", "<p>x</p>")]
+
+    try:
+        assert EmailService._deliver_in_background(app, messages) == 0
+    finally:
+        _SMTP_SESSIONS.__dict__.pop("parked", None)
+    assert attempts == ["gone@test.local"]
+    assert EmailService._is_transient(smtplib.SMTPAuthenticationError(535, b"bad credentials")) is False
+    assert EmailService._is_transient(smtplib.SMTPServerDisconnected("dropped")) is True
+    assert EmailService._is_transient(ConnectionRefusedError()) is True
+
+
+def test_sla_breach_email_greets_each_admin_over_one_connection(monkeypatch, smtp_outbox, make_cr, admin_user):
+    """Test the SLA breach email is rendered once and personalized per admin"""
+    monkeypatch.setattr(EmailService, "_get_admin_recipients",
+                        staticmethod(lambda: [(admin_user.email, admin_user.username), ("ops@test.local", "<ops>")]))
+    cr = make_cr(status=CRStatus.APPROVED, implementation_deadline=datetime.now() - timedelta(hours=3))
+
+    EmailService.send_sla_breach_email(cr)
+    assert len(smtp_outbox.connections) == 1
+    bodies = {m["To"]: html_body(m) for m in smtp_outbox.messages}
+    assert f"Dear {admin_user.username}," in bodies[admin_user.email]
+    assert "Dear &lt;ops&gt;," in bodies["ops@test.local"]
+
+
+def test_load_cr_for_email_fetches_relationships_in_one_query(db_session, make_cr, approver_user, implementer_user, admin_user):
+    """Test CR emails load the project and all CR users with a single SELECT"""
+    from sqlalchemy import event
+    from app.extensions import db
+
+    cr = make_cr(
+        approver_id=approver_user.id,
+        implementer_id=implementer_user.id,
+        closed_by_id=admin_user.id,
+        status=CRStatus.CLOSED,
+    )
+    admin_email = admin_user.email
+    db_session.expire_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        loaded = EmailService._load_cr_for_email(cr)
+        names = (loaded.project.name, loaded.requester.email, loaded.approver.email,
+                 loaded.implementer.email, loaded.closed_by.email)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert loaded is cr
+    assert names[4] == admin_email
+    assert len(statements) == 1
+
+
+def test_sla_warning_email_sends_once_per_stakeholder(smtp_outbox, make_cr, requester_user):
+    """Test a requester who is also the implementer gets a single SLA warning"""
+    cr = make_cr(
+        implementer_id=requester_user.id,
+        status=CRStatus.IN_PROGRESS,
+        implementation_deadline=datetime.now() + timedelta(hours=12),
+    )
+
+    EmailService.send_sla_warning_email(cr)
+    assert [m["To"] for m in smtp_outbox.messages] == [requester_user.email]
+    body = html_body(smtp_outbox.messages[0])
+    assert f"Dear {requester_user.username}," in body
+    assert cr.implementation_deadline.strftime("%Y-%m-%d %H:%M") in body
+
+
+def test_background_delivery_reuses_live_connection(monkeypatch, app):
+    """Test email workers keep their SMTP connection between batches while it answers NOOP"""
+    app.config.update(SMTP_USERNAME="user", SMTP_PASSWORD="pass")
+    connections = []
+
+    class TrackingSMTP(DummySMTP):
+        alive = True
+
+        def __init__(self, *a, **k):
+            connections.append(self)
+
+        def noop(self):
+            return (250, b"OK") if self.alive else (421, b"closing")
+
+    monkeypatch.setattr("smtplib.SMTP", TrackingSMTP)
+    config = EmailService._get_smtp_config()
+
+    def batch():
+        return [EmailService._build_message(config, "keep@test.local", "Keep", "<p>x</p>")]
+
+    try:
+        assert EmailService._deliver_in_background(app, batch()) == 1
+        assert EmailService._deliver_in_background(app, batch()) == 1
+        assert len(connections) == 1
+
+        connections[0].alive = False
+        assert EmailService._deliver_in_background(app, batch()) == 1
+        assert len(connections) == 2
+    finally:
+        _SMTP_SESSIONS.__dict__.pop("parked", None)
+
+
+def test_unconfigured_smtp_skips_loading_cr_emails(monkeypatch, app, make_cr, requester_user):
+    """Test CR notifiers return before querying or rendering when SMTP is not configured"""
+    app.config.update(SMTP_USERNAME=None, SMTP_PASSWORD=None)
+    cr = make_cr(approver_id=requester_user.id, implementer_id=requester_user.id, status=CRStatus.IMPLEMENTED)
+
+    def fail(*a, **k):
+        raise AssertionError("built an email that cannot be sent")
+
+    monkeypatch.setattr(EmailService, "_load_cr_for_email", staticmethod(fail))
+    monkeypatch.setattr(EmailService, "_get_admin_recipients", staticmethod(fail))
+    monkeypatch.setattr(EmailService, "_base_url", staticmethod(fail))
+
+    EmailService.send_closure_timeline_email(cr)
+    EmailService.send_sla_warning_email(cr)
+    EmailService.send_sla_breach_email(cr)
+    EmailService.send_cr_rollback_request(cr, "reason")
+    EmailService.send_cr_rollback_complete(cr)
+    assert EmailService.send_implementation_complete_notification(cr) is False
+
+
+def test_streamed_crs_need_no_reload_for_email(db_session, make_cr, approver_user):
+    """Test CRs streamed for the SLA sweep already carry what the email builders read"""
+    from sqlalchemy import event
+    from app.extensions import db
+    from app.models import ChangeRequest
+
+    cr_id = make_cr(approver_id=approver_user.id, status=CRStatus.APPROVED).id
+    db_session.expire_all()
+
+    (streamed,) = list(ChangeRequest.stream_for_email([cr_id]))
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        assert EmailService._load_cr_for_email(streamed) is streamed
+        assert streamed.approver.username == approver_user.username
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert statements == []
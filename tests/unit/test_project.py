@@ -87,3 +87,14 @@ def test_project_soft_delete(db_session, project):
     retrieved = Project.query.get(project.id)
     assert retrieved is not None
     assert retrieved.is_active is False
+
+
+def test_user_get_projects_skips_inactive(db_session, project, requester_user):
+    """Test get_projects only returns active projects with active memberships"""
+    from tests.unit.conftest import add_member
+    add_member(project, requester_user, "requester")
+    assert [p.id for p in requester_user.get_projects()] == [project.id]
+    
+    project.is_active = False
+    db_session.commit()
+    assert requester_user.get_projects() == []
@@ -15,3 +15,29 @@ def test_role_permissions_add_remove(db_session):
     role.remove_permission(perm)
     db_session.commit()
     assert role.has_permission("run_tests") is False
+
+
+def test_role_permission_cache_invalidated_on_update(db_session):
+    role = Role(name="cache_tester", description="Cache tester role")
+    perm = Permission(name="read_cache", description="Read cache")
+    db_session.add_all([role, perm])
+    db_session.commit()
+    assert role.has_permission("read_cache") is False
+
+    # Mutating the collection directly is picked up once the role is flushed
+    role.permissions.append(perm)
+    db_session.commit()
+    assert role.has_permission("read_cache") is True
+
+
+def test_insert_default_roles_is_idempotent(db_session):
+    from app.models.role import role_permissions
+
+    Role.insert_default_roles()
+    links = db_session.query(role_permissions).count()
+    Role.insert_default_roles()
+    assert db_session.query(role_permissions).count() == links
+
+    approver = Role.query.filter_by(name="approver").one()
+    assert approver.has_permission("approve_cr") is True
+    assert approver.has_permission("manage_users") is False
@@ -15,7 +15,7 @@ def test_sla_warning_and_breach_flow(monkeypatch, app, db_session, requester_use
             return self
         def __exit__(self, *exc):
             return False
-        def starttls(self):
+        def starttls(self, context=None):
             pass
         def login(self, *a, **k):
             pass
@@ -100,7 +100,7 @@ def test_no_sla_warning_for_far_deadlines(monkeypatch, app, db_session, requeste
             return self
         def __exit__(self, *exc):
             return False
-        def starttls(self):
+        def starttls(self, context=None):
             pass
         def login(self, *a, **k):
             pass
@@ -160,3 +160,73 @@ def test_sla_breach_detection(db_session, requester_user, project):
         cr.is_sla_breached = True
         db_session.commit()
         assert cr.is_sla_breached is True
+
+
+def test_sla_sweeps(make_cr):
+    """Test overdue CRs are flagged in bulk and due-soon CRs are picked for warnings"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    overdue = make_cr(status=CRStatus.APPROVED, implementation_deadline=now - timedelta(hours=1))
+    due_soon = make_cr(status=CRStatus.APPROVED, implementation_deadline=now + timedelta(hours=6))
+    far = make_cr(status=CRStatus.APPROVED, implementation_deadline=now + timedelta(days=10))
+    closed = make_cr(status=CRStatus.CLOSED, implementation_deadline=now - timedelta(hours=1))
+
+    breached_ids = ChangeRequest.sweep_sla_breaches(now)
+    assert overdue.id in breached_ids
+    assert closed.id not in breached_ids
+    assert overdue.is_sla_breached is True
+    assert ChangeRequest.sweep_sla_breaches(now) == []
+
+    candidates = ChangeRequest.sweep_warning_candidates(now)
+    assert due_soon in candidates
+    assert far not in candidates and overdue not in candidates
+
+    assert ChangeRequest.mark_sla_warning_sent([due_soon.id]) == [due_soon.id]
+    assert due_soon.sla_warning_sent is True
+    assert ChangeRequest.mark_sla_warning_sent([due_soon.id]) == []
+    assert due_soon not in ChangeRequest.sweep_warning_candidates(now)
+
+
+def test_sla_flag_committed_before_email_dispatch(monkeypatch, db_session, make_cr):
+    """Test the warning flag is persisted before the email goes out, so a failed send is not repeated"""
+    from app.extensions import db
+    from app.services.email_service import EmailService
+
+    deadline = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=6)
+    cr = make_cr(status=CRStatus.APPROVED, implementation_deadline=deadline)
+    target_id = cr.id
+    flags_at_send = []
+
+    def failing_send(sent_cr):
+        if sent_cr.id != target_id:
+            return
+        flags_at_send.append(db.session.execute(
+            ChangeRequest.__table__.select().where(ChangeRequest.id == target_id)
+        ).one().sla_warning_sent)
+        raise RuntimeError("SMTP down")
+
+    monkeypatch.setattr(EmailService, "send_sla_warning_email", staticmethod(failing_send))
+    check_sla_deadlines()
+
+    assert flags_at_send == [True]
+    db_session.refresh(cr)
+    assert cr.sla_warning_sent is True
+
+
+def test_sla_email_failure_does_not_skip_other_crs(monkeypatch, make_cr):
+    """Test one failed warning email does not stop the emails for the other claimed CRs"""
+    from app.services.email_service import EmailService
+
+    deadline = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=6)
+    failing_id, other_id = (make_cr(status=CRStatus.APPROVED, implementation_deadline=deadline).id
+                            for _ in range(2))
+    sent = []
+
+    def send(sent_cr):
+        if sent_cr.id == failing_id:
+            raise RuntimeError("template error")
+        sent.append(sent_cr.id)
+
+    monkeypatch.setattr(EmailService, "send_sla_warning_email", staticmethod(send))
+    check_sla_deadlines()
+
+    assert other_id in sent
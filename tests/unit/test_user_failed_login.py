@@ -5,3 +5,14 @@ def test_user_failed_login_lock_and_reset(db_session, requester_user):
     requester_user.reset_failed_login()
     assert requester_user.failed_login_attempts == 0
     assert requester_user.is_locked is False
+
+
+def test_user_failed_login_written_atomically(db_session, requester_user):
+    from app.models import User
+    requester_user.increment_failed_login()
+    requester_user.increment_failed_login()
+    stored = db_session.query(User.failed_login_attempts).filter_by(id=requester_user.id).scalar()
+    assert stored == 2
+    assert requester_user.failed_login_attempts == 2
+    requester_user.reset_failed_login()
+    db_session.commit()
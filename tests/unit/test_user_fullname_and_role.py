@@ -6,3 +6,84 @@ def test_user_full_name_and_roles(db_session, requester_user, admin_user):
     assert requester_user.has_role("requester") is True
     assert requester_user.is_admin() is False
     assert admin_user.is_admin() is True
+
+
+def test_user_role_name_lower(db_session, requester_user, admin_user):
+    assert requester_user.role_name_lower == "requester"
+    assert admin_user.role_name_lower == "admin"
+
+
+def test_user_permission_and_project_sets(db_session, requester_user, project):
+    from tests.unit.conftest import add_member
+    add_member(project, requester_user, "requester")
+    assert "submit_cr" in requester_user.permission_names
+    assert requester_user.has_permission("approve_cr") is False
+    assert requester_user.active_project_ids == frozenset({project.id})
+
+
+def test_user_role_name_follows_role(db_session):
+    from app.models import Role, User
+    requester = Role.query.filter_by(name="requester").first()
+    approver = Role.query.filter_by(name="approver").first()
+    user = User(username="rolesync", email="rolesync@example.com", role_id=requester.id)
+    user.set_password("Password123!")
+    db_session.add(user)
+    db_session.commit()
+    assert user.role_name == "requester"
+
+    user.role_id = approver.id
+    db_session.commit()
+    assert user.role_name == "approver"
+
+    approver.name = "reviewer"
+    db_session.commit()
+    db_session.refresh(user)
+    assert user.role_name == "reviewer"
+
+    approver.name = "approver"
+    db_session.delete(user)
+    db_session.commit()
+
+
+def test_user_project_ids_cache_invalidated(db_session, requester_user, project):
+    from app.models import ProjectMembership
+    from app.models.user import load_user
+    from tests.unit.conftest import add_member
+    add_member(project, requester_user, "requester")
+    user_id, project_id = requester_user.id, project.id
+    db_session.expunge_all()
+    assert project_id in load_user(user_id).active_project_ids
+
+    ProjectMembership.query.filter_by(user_id=user_id).update({'is_active': False})
+    db_session.commit()
+    db_session.expunge_all()
+    assert load_user(user_id).active_project_ids == frozenset()
+
+    membership = ProjectMembership.query.filter_by(user_id=user_id).first()
+    membership.is_active = True
+    db_session.commit()
+    db_session.expunge_all()
+    assert load_user(user_id).active_project_ids == frozenset({project_id})
+
+
+def test_user_full_name_falls_back_to_username_in_sql(db_session, requester_user):
+    from app.models import User
+    requester_user.first_name = "Solo"
+    requester_user.last_name = None
+    db_session.commit()
+    assert requester_user.full_name == requester_user.username
+    found = User.query.filter(User.full_name == requester_user.username).first()
+    assert found is requester_user
+
+
+def test_load_user_raises_on_unplanned_lazy_load(db_session, requester_user):
+    import pytest
+    from sqlalchemy.exc import InvalidRequestError
+    from app.models.user import load_user
+    user_id = requester_user.id
+    db_session.expunge_all()
+    user = load_user(user_id)
+    assert user.role_name_lower == "requester"
+    assert user.active_project_ids == frozenset()
+    with pytest.raises(InvalidRequestError):
+        user.change_requests
@@ -1,4 +1,7 @@
 """Unit tests for User model functionality"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+
 from app.models import User, Role
 
 
@@ -36,6 +39,21 @@ def test_user_mfa_setup(db_session, requester_user):
     assert len(requester_user.mfa_secret) > 0
 
 
+def test_user_totp_follows_secret_change(db_session, requester_user):
+    """Test the cached TOTP object is rebuilt when the secret changes"""
+    import pyotp
+
+    requester_user.generate_mfa_secret()
+    assert requester_user.verify_totp(pyotp.TOTP(requester_user.mfa_secret).now()) is True
+
+    old_code = pyotp.TOTP(requester_user.mfa_secret).now()
+    requester_user.generate_mfa_secret()
+    assert requester_user.verify_totp(pyotp.TOTP(requester_user.mfa_secret).now()) is True
+    assert requester_user.mfa_secret in requester_user.get_totp_uri()
+    if old_code != pyotp.TOTP(requester_user.mfa_secret).now():
+        assert requester_user.verify_totp(old_code) is False
+
+
 def test_user_account_locking(db_session, requester_user):
     """Test user account can be locked"""
     requester_user.is_locked = True
@@ -87,3 +105,56 @@ def test_user_failed_login_attempts(db_session, requester_user):
         db_session.commit()
         
         assert requester_user.failed_login_attempts == initial_count + 1
+
+
+def test_invitation_find_valid(db_session, requester_user):
+    """Test invitation lookup by token, including accepted and unknown tokens"""
+    from app.models import UserInvitation
+
+    invitation = UserInvitation(user_id=requester_user.id)
+    db_session.add(invitation)
+    db_session.commit()
+    token = invitation.token
+    db_session.expunge(invitation)
+
+    found = UserInvitation.find_valid(token)
+    assert found is not None
+    assert found.is_valid() is True
+
+    found.accept()
+    db_session.commit()
+    assert UserInvitation.find_valid(token) is None
+    assert UserInvitation.find_valid('no-such-token') is None
+
+    db_session.delete(found)
+    db_session.commit()
+
+
+def test_invitation_token_is_unique(db_session, requester_user, approver_user):
+    """Test two invitations cannot share a token"""
+    from app.models import UserInvitation
+
+    first = UserInvitation(user_id=requester_user.id)
+    second = UserInvitation(user_id=approver_user.id)
+    second.token = first.token
+    db_session.add_all([first, second])
+    with pytest.raises(IntegrityError):
+        db_session.flush()
+    db_session.rollback()
+
+
+def test_admin_recipients_follow_role_changes(db_session, requester_user):
+    """Test the cached admin list picks up promotions and demotions"""
+    admin_role = Role.query.filter_by(name="admin").first()
+    requester_role = requester_user.role
+    entry = (requester_user.email, requester_user.username)
+    assert entry not in User.admin_recipients()
+    assert User.admin_recipients() is User.admin_recipients()
+
+    requester_user.role = admin_role
+    db_session.commit()
+    assert entry in User.admin_recipients()
+
+    requester_user.role = requester_role
+    db_session.commit()
+    assert entry not in User.admin_recipients()
@@ -3,3 +3,14 @@ def test_user_password_hashing_and_check(db_session, requester_user):
     db_session.commit()
     assert requester_user.check_password("secret123") is True
     assert requester_user.check_password("wrong") is False
+
+
+def test_legacy_password_hash_is_upgraded(db_session, requester_user):
+    from werkzeug.security import generate_password_hash
+
+    requester_user.password_hash = generate_password_hash("legacy123")
+    db_session.commit()
+    assert requester_user.check_password("wrong") is False
+    assert requester_user.check_password("legacy123") is True
+    assert requester_user.password_hash.startswith("$argon2")
+    assert requester_user.check_password("legacy123") is True